@@ -0,0 +1,248 @@
+#########################################################################################################
+#                                                                                                       #
+#  Buildhub for openATV: one instance polls the build server, all other receivers read from the hub     #
+#  Coded by Mr.Servo @ openATV (c) 2023                                                                 #
+#  Learn more about the tool by running it in the shell: "python Buildhub.py -h"                        #
+#  -----------------------------------------------------------------------------------------------------#
+#  This plugin is licensed under the GNU version 3.0 <https://www.gnu.org/licenses/gpl-3.0.en.html>.    #
+#  This plugin is NOT free software. It is open source, you are allowed to modify it (if you keep       #
+#  the license), but it may not be commercially distributed. Advertise with this tool is not allowed.   #
+#  For other uses, permission from the authors is necessary.                                            #
+#                                                                                                       #
+#########################################################################################################
+
+# PYTHON IMPORTS
+from getopt import getopt, GetoptError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from os import makedirs, replace
+from os.path import join, exists
+from re import match
+from requests import exceptions
+from sys import exit, argv
+from threading import Event, Lock, Thread
+
+# PLUGIN IMPORTS
+try:
+	from .Buildstatus import Buildstatus, CONTENTURL, SNAPSHOTDIR, SCHEDULER, PREFETCH, PICTURES, parseduration, parsetimestamp, urlkey
+except ImportError:  # called from shell
+	from Buildstatus import Buildstatus, CONTENTURL, SNAPSHOTDIR, SCHEDULER, PREFETCH, PICTURES, parseduration, parsetimestamp, urlkey
+
+MODULE_NAME = __name__.split(".")[-1]
+HUBPORT = 8780
+PICURL = "https://raw.githubusercontent.com/oe-alliance/remotes/master/boxes/"
+PICDIR = join(SNAPSHOTDIR, "boxpictures")
+HUBSNAPSHOTDIR = join(SNAPSHOTDIR, "hub")  # the hub runs in the process of the plugin, both keep their own snapshots and history
+# (name, help) of all metric families, rendered in this order
+METRICS = (("openatv_snapshot_timestamp_seconds", "Time the build status of the platform was fetched"),
+			("openatv_boxes", "Number of boxes of the platform"),
+			("openatv_failed_boxes", "Number of boxes whose last build failed"),
+			("openatv_cycle_seconds", "Duration of the last complete build cycle"),
+			("openatv_building_box_info", "Box the image is currently built for"),
+			("openatv_box_status_info", "Build status of the box"),
+			("openatv_box_build_seconds", "Duration of the last build of the box"),
+			("openatv_box_end_build_timestamp_seconds", "Time the last build of the box ended"))
+OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class Buildhub():
+	def __init__(self, port=HUBPORT, interval=300, mirrors=None):
+		self.port = port
+		self.interval = interval  # seconds between two polls of the build server
+		self.BS = Buildstatus(snapshotdir=HUBSNAPSHOTDIR, mirrors=mirrors)
+		self.BS.priority = PREFETCH  # polls of the hub never delay interactive requests of this box
+		self.published = dict()  # {urlkey: serialized snapshot}
+		self.etaindex = dict()  # {architecture: serialized estimations of all boxes}
+		self.samples = dict()  # {platform: (snapshot timestamp, {metric name: [sample lines]})}
+		self.metrics = b"# EOF\n"  # rendered once per new snapshot, scrapes never access the build server
+		self.httpd = None
+		self.stopevent = Event()
+		self.piclock = Lock()  # guards 'piclocks' only
+		self.piclocks = dict()  # {boxname: lock held while the picture is downloaded}
+
+	def start(self):
+		try:
+			self.httpd = ThreadingHTTPServer(("", self.port), HubRequestHandler)
+		except OSError as err:
+			print("[%s] ERROR in module 'start': %s" % (MODULE_NAME, str(err)))
+			return False
+		self.httpd.hub = self
+		self.stopevent.clear()
+		Thread(target=self.httpd.serve_forever, daemon=True).start()
+		Thread(target=self.poll, daemon=True).start()
+		print("[%s] hub is serving on port %s..." % (MODULE_NAME, self.port))
+		return True
+
+	def stop(self):
+		self.stopevent.set()
+		if self.httpd:
+			self.httpd.shutdown()
+			self.httpd.server_close()
+			self.httpd = None
+
+	def poll(self):  # the only loop accessing the build server, regardless of the number of clients
+		while not self.stopevent.is_set():
+			self.refresh()
+			self.stopevent.wait(self.interval)
+
+	def refresh(self):
+		self.BS.start()
+		if self.BS.error:
+			print(self.BS.error)
+			return
+		self.publish(CONTENTURL)
+		changed = False
+		for platform in self.BS.platlist:
+			if self.stopevent.is_set():
+				break
+			self.BS.getbuildinfos(platform)
+			if self.BS.error:
+				print(self.BS.error)
+				continue
+			self.publish(self.BS.url)
+			self.etaindex[platform.split(" ")[0].upper()] = dumps(self.estimate()).encode()
+			timestamp = self.BS.snapshots[self.BS.url][0]
+			if self.samples.get(platform, (None,))[0] != timestamp:  # new snapshot version
+				self.samples[platform] = (timestamp, self.measure(platform, timestamp))
+				changed = True
+		if changed:
+			self.metrics = self.rendermetrics()
+
+	def publish(self, url):  # serialize once per poll, requests are answered without any further effort
+		snapshot = self.BS.snapshots.get(url)
+		if snapshot:
+			self.published[urlkey(url)] = dumps(snapshot).encode()
+
+	def estimate(self):  # forecasts of all boxes of current platform
+		nextbuild, boxesahead, cycletime, counter, failed = self.BS.evaluate()
+		estimation = {"timestamp": self.BS.snapshots[self.BS.url][0], "boxcounter": counter, "failed": failed}
+		estimation.update(self.BS.forecast())
+		return estimation
+
+	def measure(self, platform, timestamp):  # samples of all metrics of current platform
+		nextbuild, boxesahead, cycletime, counter, failed = self.BS.evaluate()
+		buildbox = self.BS.findbuildbox()
+		labels = 'platform="%s"' % escapelabel(platform)
+		samples = {name: [] for name, description in METRICS}
+		samples["openatv_snapshot_timestamp_seconds"].append("{%s} %s" % (labels, int(timestamp)))
+		samples["openatv_boxes"].append("{%s} %s" % (labels, counter))
+		samples["openatv_failed_boxes"].append("{%s} %s" % (labels, failed))
+		samples["openatv_cycle_seconds"].append("{%s} %s" % (labels, int(cycletime.total_seconds()) if cycletime else 0))
+		if buildbox:
+			samples["openatv_building_box_info"].append('{%s,box="%s"} 1' % (labels, escapelabel(buildbox)))
+		for boxname, bd in self.BS.htmldict["boxinfo"].items():
+			boxlabels = '%s,box="%s"' % (labels, escapelabel(boxname))
+			samples["openatv_box_status_info"].append('{%s,status="%s"} 1' % (boxlabels, escapelabel(bd["BuildStatus"].strip())))
+			buildtime = parseduration(bd["BuildTime"])
+			if buildtime is not None:
+				samples["openatv_box_build_seconds"].append("{%s} %s" % (boxlabels, buildtime))
+			endbuild = parsetimestamp(bd["EndBuild"])
+			if endbuild is not None:
+				samples["openatv_box_end_build_timestamp_seconds"].append("{%s} %s" % (boxlabels, int(endbuild)))
+		return samples
+
+	def rendermetrics(self):  # OpenMetrics text of all platforms, samples of a metric family are grouped as required
+		lines = []
+		for name, description in METRICS:
+			lines.append("# TYPE %s gauge" % name)
+			lines.append("# HELP %s %s." % (name, description))
+			for platform in sorted(self.samples):
+				lines.extend("%s%s" % (name, sample) for sample in self.samples[platform][1][name])
+		lines.append("# EOF\n")
+		return "\n".join(lines).encode()
+
+	def getpicture(self, boxname):  # box pictures are downloaded only once for all clients
+		picfile = join(PICDIR, "%s.png" % boxname)
+		if not exists(picfile):  # downloads of other boxes and pictures on disk are never blocked
+			with self.piclock:
+				boxlock = self.piclocks.setdefault(boxname, Lock())
+			with boxlock:
+				if not exists(picfile):
+					try:
+						response = SCHEDULER.get("%s%s.png" % (PICURL, boxname), PICTURES, timeout=(3.05, 6))
+						response.raise_for_status()
+					except exceptions.RequestException as err:
+						print("[%s] ERROR in module 'getpicture': %s" % (MODULE_NAME, str(err)))
+						return None
+					makedirs(PICDIR, exist_ok=True)
+					tmpfile = "%s.tmp" % picfile
+					with open(tmpfile, "wb") as f:
+						f.write(response.content)
+					replace(tmpfile, picfile)  # atomic: readers without lock never get an incomplete picture
+		with open(picfile, "rb") as f:
+			return f.read()
+
+
+def escapelabel(value):  # label values of OpenMetrics
+	return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class HubRequestHandler(BaseHTTPRequestHandler):
+	def do_GET(self):
+		hub = self.server.hub
+		path = self.path.split("?")[0]
+		body = None
+		ctype = "application/json"
+		found = match(r"^/(snapshot|eta|pictures)/([\w.+-]+)\.(json|png)$", path)
+		if path == "/metrics":  # OpenMetrics for Prometheus, older scrapers get the compatible text format
+			body = hub.metrics
+			ctype = OPENMETRICS if "application/openmetrics-text" in self.headers.get("Accept", "") else "text/plain; version=0.0.4; charset=utf-8"
+		elif found:
+			section, name, extension = found.groups()
+			if section == "snapshot" and extension == "json":
+				body = hub.published.get(name)
+			elif section == "eta" and extension == "json":
+				body = hub.etaindex.get(name.upper())
+			elif section == "pictures" and extension == "png":
+				body = hub.getpicture(name)
+				ctype = "image/png"
+		if body is None:
+			self.send_error(404)
+			return
+		self.send_response(200)
+		self.send_header("Content-Type", ctype)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):  # keep the logs quiet
+		pass
+
+
+def main(argv):  # shell interface
+	port = HUBPORT
+	interval = 300
+	mirrors = []
+	helpstring = "Buildhub v1.0: try 'python Buildhub.py -h' for more information"
+	try:
+		opts, args = getopt(argv, "p:i:m:h", ["port =", "interval =", "mirror =", "help"])
+	except GetoptError:
+		print(helpstring)
+		exit(2)
+	for opt, arg in opts:
+		opt = opt.lower().strip()
+		arg = arg.strip()
+		if opt == "-h":
+			print("Usage: python Buildhub.py [options...] <data>\n"
+			"-p, --port <data>\t\tServe on this port {%s is default}\n"
+			"-i, --interval <seconds>\tPoll the build server in this interval {300 is default}\n"
+			"-m, --mirror <url>\t\tAlso request the build server data from this mirror, the fastest answer is taken (repeatable)\n"
+			"Endpoints: /snapshot/<urlkey>.json, /eta/<architecture>.json, /pictures/<boxname>.png, /metrics (OpenMetrics exporter)\n"
+			"Clients: 'python Buildstatus.py -u http://<host>:<port>' or the plugin settings" % HUBPORT)
+			exit()
+		elif opt in ("-p", "--port"):
+			port = int(arg)
+		elif opt in ("-i", "--interval"):
+			interval = int(arg)
+		elif opt in ("-m", "--mirror"):
+			mirrors.append(arg)
+	hub = Buildhub(port, interval, mirrors)
+	if hub.start():
+		try:
+			hub.stopevent.wait()
+		except KeyboardInterrupt:
+			hub.stop()
+
+
+if __name__ == "__main__":
+	main(argv[1:])
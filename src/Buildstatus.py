@@ -12,19 +12,324 @@
 #########################################################################################################
 
 # PYTHON IMPORTS
-from datetime import timedelta
+from atexit import register
+from bisect import bisect_left, insort
+from codecs import getincrementaldecoder
+from collections import deque
+from datetime import datetime, timedelta
+from functools import partial
 from getopt import getopt, GetoptError
-from json import loads, dump
-from re import search, findall, S, M
+from hashlib import md5
+from itertools import accumulate
+from json import loads, load, dump
+from os import listdir, makedirs, replace
+from os.path import basename, getmtime, isdir, join, splitext
+from queue import Queue, Empty
+from re import search, findall, sub, I, S, M
 from requests import get, exceptions
 from sys import exit, argv
-from twisted.internet.reactor import callInThread
+from tempfile import gettempdir
+from threading import Condition, Lock, Thread
+from time import time
+from urllib.parse import urlparse
+try:
+	import numpy  # optional: vectorized forecasts, otherwise the same calculation is done in plain python
+except ImportError:
+	numpy = None
 
 MODULE_NAME = __name__.split(".")[-1]
+CONTENTURL = "http://api.mynonpublic.com/content.json"
+SNAPSHOTDIR = join(gettempdir(), "buildstatus")
+CHUNKSIZE = 4096  # bytes per chunk when streaming pages
+HEDGEDELAY = 1.0  # seconds until a hedged request is sent to an endpoint without latency history
+FOREGROUND, PREFETCH, PICTURES = 0, 1, 2  # priority classes of requests, lower values are sent first
+PRIORITYNAMES = ("foreground", "prefetch", "pictures")
+MAXWAIT = (10, 30, 15)  # seconds a request of each priority class may wait in the queue before it is shed
+HOSTRATE = (2, 4)  # token bucket of each host: (requests per second, burst)
+GLOBALRATE = (5, 8)  # token bucket of the whole process: (requests per second, burst)
+HISTORYSIZE = 10  # number of recent build durations per box used for forecasts
+BANDSIGMA = 1.2816  # z-value of the 10% and 90% percentiles, width of the confidence band
 
 
-class Buildstatus():
+class Cancelled(Exception):  # raised in a download which has been superseded by a newer request
+	pass
+
+
+class Shed(exceptions.RequestException):  # raised instead of sending a request which waited too long in the queue
+	pass
+
+
+class Circuitbreaker():
+	def __init__(self, threshold=3, cooldown=60):
+		self.threshold = threshold  # consecutive failures until the circuit of a host opens
+		self.cooldown = cooldown  # seconds until an open circuit lets a single probe request pass (=half-open)
+		self.circuits = dict()  # {host: {"failures": int, "openedat": timestamp, "probing": bool}}
+		self.lock = Lock()
+
+	def allow(self, host):  # False = fail fast without waiting for the timeouts of an unavailable host
+		with self.lock:
+			circuit = self.circuits.get(host)
+			if not circuit or circuit["failures"] < self.threshold:
+				return True
+			if not circuit["probing"] and time() - circuit["openedat"] >= self.cooldown:
+				circuit["probing"] = True
+				return True
+			return False
+
+	def success(self, host):
+		with self.lock:
+			self.circuits.pop(host, None)
+
+	def release(self, host):  # the request allowed for host was not sent (e.g. shed), so a probe may pass again
+		with self.lock:
+			circuit = self.circuits.get(host)
+			if circuit:
+				circuit["probing"] = False
+
+	def failure(self, host):
+		with self.lock:
+			circuit = self.circuits.setdefault(host, {"failures": 0, "openedat": 0, "probing": False})
+			circuit["failures"] += 1
+			circuit["probing"] = False
+			if circuit["failures"] >= self.threshold:
+				circuit["openedat"] = time()  # (re)open circuit
+
+	def getstate(self, host):  # 'closed', 'open' or 'half-open'
+		with self.lock:
+			circuit = self.circuits.get(host)
+			if not circuit or circuit["failures"] < self.threshold:
+				return "closed"
+			return "half-open" if circuit["probing"] or time() - circuit["openedat"] >= self.cooldown else "open"
+
+
+CIRCUITS = Circuitbreaker()  # shared by all instances, so that every caller benefits from known outages
+
+
+class Latencytracker():
+	def __init__(self, size=20, penalty=6):
+		self.size = size  # number of recent latencies kept per endpoint
+		self.penalty = penalty  # latency in seconds recorded for a failed request
+		self.latencies = dict()  # {endpoint: deque of seconds until the response headers arrived}
+		self.lock = Lock()
+
+	def record(self, endpoint, seconds):
+		with self.lock:
+			self.latencies.setdefault(endpoint, deque(maxlen=self.size)).append(seconds)
+
+	def failure(self, endpoint):
+		self.record(endpoint, self.penalty)
+
+	def getpercentiles(self, endpoint):  # (10%, 50%, 90%) percentiles or None without history
+		with self.lock:
+			samples = list(self.latencies.get(endpoint, ()))
+		return percentiles(samples) if samples else None
+
+	def delay(self, endpoint):  # a request to endpoint slower than 90% of the recent ones gets a hedged second request
+		latencies = self.getpercentiles(endpoint)
+		return latencies[2] if latencies else HEDGEDELAY
+
+	def order(self, urls):  # fastest endpoint (median) first, endpoints without history come before all others (in their configured order) to get measured
+		return sorted(urls, key=lambda url: (self.getpercentiles(urlparse(url).netloc) or [0, 0])[1])
+
+
+LATENCIES = Latencytracker()  # shared by all instances like CIRCUITS
+
+
+class Scheduler():
+	def __init__(self, hostrate=HOSTRATE, globalrate=GLOBALRATE, maxwait=MAXWAIT):
+		self.hostrate = hostrate
+		self.globalrate = globalrate
+		self.maxwait = maxwait
+		self.buckets = dict()  # {host: [tokens, timestamp of last refill]}, key None is the bucket of the whole process
+		self.waiting = []  # [(priority, sequence, host)] of all queued requests
+		self.sequence = 0
+		self.counters = [{"depth": 0, "maxdepth": 0, "sent": 0, "shed": 0, "waittime": 0.0, "maxwait": 0.0} for name in PRIORITYNAMES]
+		self.condition = Condition()
+
+	def get(self, url, priority=FOREGROUND, **kwargs):  # requests.get after a token was granted, raises Shed if the request waited too long
+		self.acquire(urlparse(url).netloc, priority)
+		return get(url.encode(), **kwargs)
+
+	def acquire(self, host, priority=FOREGROUND):  # waits for a token of host and of the process, higher priorities are served first
+		counters = self.counters[priority]
+		with self.condition:
+			enqueued = time()
+			self.sequence += 1
+			ticket = (priority, self.sequence, host)
+			self.waiting.append(ticket)
+			counters["depth"] += 1
+			counters["maxdepth"] = max(counters["maxdepth"], counters["depth"])
+			try:
+				while True:
+					now = time()
+					ready = [waiting for waiting in self.waiting if self.tokens(waiting[2], now) >= 1]  # requests whose host has a token
+					if ready and min(ready) == ticket and self.tokens(None, now) >= 1:
+						self.buckets[host][0] -= 1
+						self.buckets[None][0] -= 1
+						waittime = now - enqueued
+						counters["sent"] += 1
+						counters["waittime"] += waittime
+						counters["maxwait"] = max(counters["maxwait"], waittime)
+						return waittime
+					if now - enqueued >= self.maxwait[priority]:
+						counters["shed"] += 1
+						raise Shed("request to '%s' was shed after waiting %.1f seconds in the queue" % (host, now - enqueued))
+					self.condition.wait(min(self.maxwait[priority] - (now - enqueued), self.nexttoken(host, now)))
+			finally:
+				self.waiting.remove(ticket)
+				counters["depth"] -= 1
+				self.condition.notify_all()
+
+	def tokens(self, host, now):  # refills and returns the tokens of a bucket
+		rate, burst = self.globalrate if host is None else self.hostrate
+		bucket = self.buckets.setdefault(host, [burst, now])
+		bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+		bucket[1] = now
+		return bucket[0]
+
+	def nexttoken(self, host, now):  # seconds until host and process will have a token again
+		return max(0.01, max((1 - self.tokens(key, now)) / (self.globalrate if key is None else self.hostrate)[0] for key in (host, None)))
+
+	def getstats(self):  # {priority name: counters}, waittime is the sum of all waiting times in seconds
+		with self.condition:
+			return {name: dict(counters) for name, counters in zip(PRIORITYNAMES, self.counters)}
+
+
+SCHEDULER = Scheduler()  # all requests of the process share one budget
+
+
+class Boxindex():
 	def __init__(self):
+		self.boxes = dict()  # {boxname: {platform: (buildstatus, rowindex)}}
+		self.platforms = dict()  # {platform: {boxname: record}} records as indexed
+		self.queues = dict()  # {platform: (rowindex of box being built, number of boxes)}
+		self.names = []  # sorted boxnames for prefix search
+		self.lock = Lock()
+
+	def update(self, platform, htmldict):  # replaces the entries of platform only, all other platforms remain untouched
+		boxinfo = htmldict["boxinfo"]
+		with self.lock:
+			indexed = self.platforms.get(platform, {})
+			if list(indexed) == list(boxinfo):  # same boxes in same order: reused records are unchanged, only update the others
+				for idx, (boxname, record) in enumerate(boxinfo.items()):
+					if record is not indexed[boxname]:
+						self.boxes[boxname][platform] = (record["BuildStatus"], idx)
+			else:
+				for boxname in set(indexed) - set(boxinfo):  # boxes no longer built on this platform
+					self.boxes[boxname].pop(platform, None)
+					if not self.boxes[boxname]:
+						del self.boxes[boxname]
+						del self.names[bisect_left(self.names, boxname)]
+				for idx, (boxname, record) in enumerate(boxinfo.items()):
+					if boxname not in self.boxes:
+						self.boxes[boxname] = dict()
+						insort(self.names, boxname)
+					self.boxes[boxname][platform] = (record["BuildStatus"], idx)
+			self.platforms[platform] = dict(boxinfo)
+			buildidx = next((idx for idx, record in enumerate(boxinfo.values()) if "Building" in record["BuildStatus"]), 0)
+			self.queues[platform] = (buildidx, len(boxinfo))
+
+	def lookup(self, boxname):  # returns {platform: (buildstatus, queueposition)}
+		result = dict()
+		with self.lock:  # 'update' runs in threads
+			for platform, (status, idx) in self.boxes.get(boxname, {}).items():
+				buildidx, count = self.queues[platform]
+				result[platform] = (status, (idx - buildidx) % count)
+		return result
+
+	def prefixsearch(self, prefix):
+		with self.lock:
+			idx = bisect_left(self.names, prefix)
+			found = []
+			while idx < len(self.names) and self.names[idx].startswith(prefix):
+				found.append(self.names[idx])
+				idx += 1
+			return found
+
+	def search(self, text):  # substring search, prefix hits come first
+		found = self.prefixsearch(text)
+		hits = set(found)
+		with self.lock:
+			return found + [boxname for boxname in self.names if text in boxname and boxname not in hits]
+
+
+def parseduration(timestring):  # seconds of e.g. '01:23:45' or '1 day, 01:23:45', None if not available
+	found = findall(r"(\d+):(\d\d):(\d\d)", timestring or "")
+	if not found:
+		return None
+	h, m, s = found[-1]
+	days = search(r"(\d+)\s*day", timestring)
+	return (int(days.group(1)) if days else 0) * 86400 + int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def parsetimestamp(datestring):  # epoch of e.g. '2023-07-24 19:33:00', None if not parseable
+	for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M"):
+		try:
+			return datetime.strptime(datestring.strip(), fmt).timestamp()
+		except (ValueError, AttributeError):
+			pass
+	return None
+
+
+def percentiles(samples):  # (10%, 50%, 90%) percentiles of a non-empty list, linear interpolation like numpy
+	samples = sorted(samples)
+	result = []
+	for percent in (10, 50, 90):
+		pos = (len(samples) - 1) * percent / 100
+		low = int(pos)
+		high = min(low + 1, len(samples) - 1)
+		result.append(samples[low] + (samples[high] - samples[low]) * (pos - low))
+	return result
+
+
+class Pagestream():
+	def __init__(self, response):
+		self.response = response
+		charset = search(r"charset=[\"']?([\w.:-]+)", response.headers.get("Content-Type", ""))  # 'response.encoding' is ISO-8859-1 for html without charset
+		try:
+			self.decoder = getincrementaldecoder(charset.group(1) if charset else "utf-8")(errors="replace")
+		except LookupError:  # unknown charset
+			self.decoder = getincrementaldecoder("utf-8")(errors="replace")
+		self.outside = []  # text outside of <tbody> (title, headline, versionurls)
+
+	def rows(self):  # generator: yields the text of each row as soon as it has been received completely
+		buffer = ""
+		intable = False
+		finished = False
+		for chunk in self.response.iter_content(CHUNKSIZE):
+			buffer += self.decoder.decode(chunk)
+			if finished:
+				continue
+			if not intable:
+				pos = buffer.find("<tbody>")
+				if pos < 0:
+					self.outside.append(buffer[:-7])  # keep a possibly incomplete tag
+					buffer = buffer[-7:]
+					continue
+				self.outside.append(buffer[:pos])
+				buffer = buffer[pos + 7:]
+				intable = True
+			while True:
+				start = buffer.find("<tr>")
+				stop = buffer.find("</tbody>")
+				if stop >= 0 and (start < 0 or stop < start):
+					buffer = buffer[stop + 8:]
+					finished = True
+					break
+				end = buffer.find("</tr>", start) if start >= 0 else -1
+				if end < 0:
+					break
+				yield buffer[start + 4:end]
+				buffer = buffer[end + 5:]
+		self.outside.append(buffer + self.decoder.decode(b"", final=True) if finished or not intable else "")
+
+
+def urlkey(url):  # unique key of an url, used for snapshot filenames and by hubs
+	return md5(url.encode()).hexdigest()
+
+
+class Buildstatus():
+	def __init__(self, swr=False, maxage=300, snapshotdir=SNAPSHOTDIR, hub=None, mirrors=None):
 		self.error = None
 		self.url = None
 		self.htmldict = None
@@ -32,87 +337,348 @@ class Buildstatus():
 		self.archlist = []  # list of available architectures (=shortnames of plattforms)
 		self.platlist = []  # list of available platforms (=longnames of platforms)
 		self.platdict = {}  # dict of available platforms and relating urls
+		self.archdict = {}  # dict of available architectures and relating platforms
+		self.platform = None  # platform of current htmldict
+		self.index = Boxindex()  # all boxes of all platforms fetched so far
+		self.history = None  # {platform: {boxname: {"end": EndBuild, "durations": [seconds, ...]}}}, loaded on first use
+		self.forecastcache = (None, 0, {})  # (key, timestamp, forecasts of current platform)
+		self.rowcache = dict()  # {url: {fingerprint: (boxname, record)}} of the last parse, unchanged rows are reused from here
+		self.generation = 0  # number of the latest request, results of older requests are discarded
+		self.swr = swr  # stale-while-revalidate: serve last good snapshot at once and refresh it in background
+		self.maxage = maxage  # snapshots younger than this (in seconds) are considered to be fresh
+		self.snapshotdir = snapshotdir  # last good snapshots are saved here (None = memory only)
+		self.snapshots = dict()  # {url: (timestamp, data)}
+		self.revalidating = set()  # urls currently being refreshed in background
+		self.age = 0  # age in seconds of the data currently served
+		self.stale = False  # True if the data currently served is outdated
+		self.clock = None  # time of the data replayed from a file, None = current time
+		self.mirrors = list(mirrors or [])  # base urls of mirrors serving the same paths as the build server
+		self.priority = FOREGROUND  # priority class of the requests of this instance (see Scheduler)
+		self.hub = hub.rstrip("/") if hub else None  # url of a hub (see Buildhub.py) which is asked before the build server
 
 	def start(self):  # loads json-platformdata from build server
-		try:
-			response = get("http://api.mynonpublic.com/content.json".encode(), timeout=(3.05, 6))
-			response.raise_for_status()
-		except exceptions.RequestException as err:
-			self.error = "[%s] ERROR in module 'start': '%s" % (MODULE_NAME, str(err))
-			return {}
-		try:
-			dictdata = loads(response.content)
-			if dictdata:
-				self.platdict = dictdata
-				self.platlist = list(self.platdict["versionurls"].keys())
-				self.archlist = [x.split(" ")[0].upper() for x in self.platlist]  # get architecture (=shortname) from platform (=keyname)
-				return dictdata
-			self.error = "[%s] ERROR in module 'start': server access failed." % MODULE_NAME
-		except Exception as err:
-			self.error = "[%s] ERROR in module 'start': invalid json data from server. %s" % (MODULE_NAME, str(err))
+		dictdata, self.error, self.age, self.stale = self.getdata(CONTENTURL, "start", self.jsonparse)
+		if dictdata:
+			self.platdict = dictdata
+			self.platlist = list(self.platdict["versionurls"].keys())
+			self.archlist = [x.split(" ")[0].upper() for x in self.platlist]  # get architecture (=shortname) from platform (=keyname)
+			self.archdict = dict()
+			for arch, platform in zip(self.archlist, self.platlist):
+				self.archdict.setdefault(arch, platform)
+			return dictdata
 		return {}
 
 	def stop(self):
 		self.callback = None
 		self.error = None
+		self.cancel()
 
-	def getpage(self):  # loads html-imagedata from build server
-		self.error = None
-		if self.url:
-			if self.callback:
-				print("[%s] accessing buildservers for data..." % MODULE_NAME)
+	def cancel(self):  # running downloads are aborted, their results will never be shown
+		self.generation += 1
+
+	def getdata(self, url, module, parser, rowcallback=None):  # returns (data, error, age, stale): fresh data, otherwise the last good snapshot or None
+		snapshot = self.loadsnapshot(url)  # runs in threads too: shared state is set by the caller only
+		if snapshot and self.swr:
+			age, stale = self.getage(snapshot[0])
+			if stale:
+				self.revalidate(url, module, parser)
+			return snapshot[1], None, age, stale
+		data, error = self.download(url, module, parser, rowcallback, self.priority)
+		if data:
+			return (data, None) + self.getage(self.snapshots[url][0])
+		if snapshot:  # build server is unavailable: fall back to last good snapshot
+			age = self.getage(snapshot[0])[0]
+			print("%s - using snapshot from %s h ago." % (error, self.strf_delta(timedelta(seconds=age))))
+			return snapshot[1], None, age, True
+		return None, error, 0, False
+
+	def download(self, url, module, parser, rowcallback=None, priority=FOREGROUND):  # returns (data, error), valid data will be saved as snapshot
+		if self.hub:  # hubs deliver snapshots already parsed, build server is the fallback only
+			snapshot, error = self.fetch("%s/snapshot/%s.json" % (self.hub, urlkey(url)), module, self.jsonparse, mirrored=False, priority=priority)
+			if snapshot:
+				self.savesnapshot(url, snapshot[1], snapshot[0])
+				return snapshot[1], None
+			print("%s - falling back to build server." % error)
+		data, error = self.fetch(url, module, parser, rowcallback, priority=priority)
+		if data:
+			self.savesnapshot(url, data)
+		return data, error
+
+	def fetch(self, url, module, parser, rowcallback=None, mirrored=True, priority=FOREGROUND):  # returns (data, error), the parser reads the response while it is streamed
+		url, response, error = self.request(self.endpoints(url) if mirrored else [url], module, priority, mirrored)
+		if response is None:
+			return None, error
+		host = urlparse(url).netloc
+		try:
+			with response:
+				data = parser(response, rowcallback)
+		except exceptions.RequestException as err:  # connection lost while streaming
+			CIRCUITS.failure(host)
+			return None, "[%s] ERROR in module '%s': '%s" % (MODULE_NAME, module, str(err))
+		except Cancelled:  # leaving 'with' closes the connection, no further bytes are loaded
+			raise
+		except Exception as err:
+			return None, "[%s] ERROR in module '%s': invalid data from server. %s" % (MODULE_NAME, module, str(err))
+		if not data:
+			return None, "[%s] ERROR in module '%s': server access failed." % (MODULE_NAME, module)
+		return data, None
+
+	def endpoints(self, url):  # url and its counterparts on all mirrors
+		parsed = urlparse(url)
+		path = url[len("%s://%s" % (parsed.scheme, parsed.netloc)):]
+		return [url] + ["%s%s" % (mirror.rstrip("/"), path) for mirror in self.mirrors]
+
+	def request(self, urls, module, priority=FOREGROUND, hedged=True):  # returns (url, response, error) of the first endpoint answering, slow endpoints get hedged requests
+		results = Queue()
+		candidates = LATENCIES.order(urls)
+		failovers = len(candidates)  # later candidates are hedges only, they are never sent after a failure
+		if len(candidates) == 1 and hedged:  # without mirrors a slow request is hedged on the same endpoint
+			candidates *= 2
+		started = 0
+		pending = 0
+		hedgeat = 0
+		errors = []
+		while True:
+			while started < len(candidates) and (not pending or time() >= hedgeat):  # first request, hedged request or failover
+				if not pending and started >= failovers:  # a failed endpoint gets no second request
+					break
+				url = candidates[started]
+				host = urlparse(url).netloc
+				started += 1
+				if not CIRCUITS.allow(host):
+					errors.append("[%s] ERROR in module '%s': server '%s' is unavailable, request skipped." % (MODULE_NAME, module, host))
+					continue
+				Thread(target=self.race, args=(url, module, results, priority, started > failovers), daemon=True).start()
+				pending += 1
+				hedgeat = time() + LATENCIES.delay(host)
+			if not pending:
+				return None, None, errors[-1] if errors else None
+			try:
+				url, response, error = results.get(timeout=max(0, hedgeat - time()) if started < len(candidates) else None)
+			except Empty:  # no answer within the usual latency: send hedged request
+				continue
+			pending -= 1
+			if response is not None:
+				if pending:
+					Thread(target=self.discard, args=(results, pending), daemon=True).start()
+				return url, response, None
+			errors.append(error)
+
+	def race(self, url, module, results, priority=FOREGROUND, duplicate=False):  # a single request of the race, the result is put into results
+		host = urlparse(url).netloc
+		try:
+			SCHEDULER.acquire(host, priority)
+		except Shed as err:  # neither the host nor its latency is to blame
+			CIRCUITS.release(host)
+			results.put((url, None, "[%s] ERROR in module '%s': %s" % (MODULE_NAME, module, str(err))))
+			return
+		start = time()
+		try:
+			response = get(url.encode(), timeout=(3.05, 6), stream=True)
+			response.raise_for_status()
+		except exceptions.RequestException as err:
+			if not duplicate:  # the hedge on the same endpoint counts a failure once only
+				CIRCUITS.failure(host)
+				LATENCIES.failure(host)
+			results.put((url, None, "[%s] ERROR in module '%s': '%s" % (MODULE_NAME, module, str(err))))
+			return
+		LATENCIES.record(host, time() - start)
+		CIRCUITS.success(host)
+		results.put((url, response, None))
+
+	def discard(self, results, pending):  # closes the responses of the losers as soon as they arrive, their bodies are never loaded
+		for idx in range(pending):
+			url, response, error = results.get()
+			if response is not None:
+				response.close()
+
+	def revalidate(self, url, module, parser):  # refreshes snapshot in background
+		if url not in self.revalidating:
+			self.revalidating.add(url)
+			Thread(target=self.revalidation, args=(url, module, parser), daemon=True).start()
+
+	def revalidation(self, url, module, parser):
+		data, error = self.download(url, module, parser, priority=PREFETCH)
+		if error:
+			print(error)
+		self.revalidating.discard(url)
+
+	def getage(self, timestamp):  # returns (age in seconds, stale)
+		age = max(0, int(time() - timestamp))
+		return age, age > self.maxage
+
+	def snapshotfile(self, url):
+		return join(self.snapshotdir, "%s.json" % urlkey(url))
+
+	def loadsnapshot(self, url):
+		snapshot = self.snapshots.get(url)
+		if snapshot is None and self.snapshotdir:
 			try:
-				response = get(self.url.encode(), timeout=(3.05, 6))
-				response.raise_for_status()
-			except exceptions.RequestException as err:
-				self.error = "[%s] ERROR in module 'getpage': '%s" % (MODULE_NAME, str(err))
-				return
+				with open(self.snapshotfile(url), "r") as f:
+					snapshot = tuple(load(f))
+				self.snapshots[url] = snapshot
+			except (OSError, ValueError):
+				pass
+		return snapshot
+
+	def savesnapshot(self, url, data, timestamp=None):
+		snapshot = (timestamp or time(), data)
+		self.snapshots[url] = snapshot
+		if self.snapshotdir:
 			try:
-				htmldata = response.content.decode()
-				if htmldata:
-					return htmldata
-				self.error = "[%s] ERROR in module 'getpage': server access failed." % MODULE_NAME
-			except Exception as err:
-				self.error = "[%s] ERROR in module 'getpage': invalid data from server %s" % (MODULE_NAME, str(err))
-		else:
-			self.error = "[%s] ERROR in module 'getpage': missing url" % MODULE_NAME
+				makedirs(self.snapshotdir, exist_ok=True)
+				filename = self.snapshotfile(url)
+				with open("%s.tmp" % filename, "w") as f:
+					dump(snapshot, f)
+				replace("%s.tmp" % filename, filename)  # atomic, readers never see a partly written snapshot
+			except OSError as err:
+				print("[%s] WARNING in module 'savesnapshot': %s" % (MODULE_NAME, str(err)))
 
-	def getbuildinfos(self, platform, callback=None):  # loads imagesdata from build server
+	def getbuildinfos(self, platform, callback=None, rowcallback=None):  # loads imagesdata from build server, rowcallback(boxname, record) receives the rows while the page is loading
 		self.callback = callback
 		self.error = None
+		self.cancel()  # every new request supersedes all running ones
 		if not platform:
 			self.error = "[%s] ERROR in module 'start': '%s" % (MODULE_NAME, "platform is None")
-		self.url = self.platdict["versionurls"][platform]["url"]
+		url = self.platdict["versionurls"][platform]["url"]
 		if callback:
 			if self.error:
 				callback()
 			else:
-				callInThread(self.createdict, callback)
+				from twisted.internet.reactor import callInThread  # only needed for threaded calls (e.g. Enigma2)
+				callInThread(self.createdict, callback, url, platform, rowcallback, self.generation)
 		else:
-			return None if self.error else self.createdict()
+			self.url = url
+			self.platform = platform
+			return None if self.error else self.createdict(rowcallback=rowcallback)
 
 	def getplatform(self, currarch):  # get platform (=keyname) from currarch (=shortname)
-		platform = None
-		if self.platdict and currarch in self.archlist:
+		return self.archdict.get(currarch.upper()) if currarch else None
+
+	def findplatform(self, boxname):  # get platform of boxname, unknown platforms are fetched until box is found
+		platforms = self.index.lookup(boxname)
+		if not platforms:
 			for platform in self.platlist:
-				if currarch.upper() in platform:
-					break
-		return platform
+				if platform not in self.index.platforms:
+					self.getbuildinfos(platform)
+					platforms = self.index.lookup(boxname)
+					if platforms:
+						break
+		return next(iter(platforms), None)
+
+	def indexall(self):  # fetch all platforms not indexed yet
+		for platform in self.platlist:
+			if platform not in self.index.platforms:
+				self.getbuildinfos(platform)
+		return self.index
 
-	def createdict(self, callback=None):  # coordinates 'get html-imagesdata & create imagesdict'
-		htmldata = self.getpage()
-		if htmldata:
-			self.htmldict = self.htmlparse(htmldata)  # complete dict of all platform boxes
+	def loadfile(self, filename, html=False):  # offline replay of a JSON export (-j), a snapshot or a raw HTML capture of a platform page
+		self.error = None
+		timestamp = None
+		try:
+			with open(filename, "r") as f:
+				content = f.read()
+			if html:
+				htmldict = self.htmlparse(content, filename)
+			else:
+				htmldict = loads(content)
+				if isinstance(htmldict, list) and len(htmldict) == 2:  # snapshot: [timestamp, data]
+					timestamp, htmldict = htmldict
+				elif isinstance(htmldict, dict):  # export (-j): {..., "timestamp": time of the data}
+					timestamp = htmldict.pop("timestamp", None)
+		except (OSError, ValueError) as err:
+			self.error = "[%s] ERROR in module 'loadfile': %s" % (MODULE_NAME, str(err))
+			return None
+		if not isinstance(htmldict, dict) or "boxinfo" not in htmldict:
+			self.error = "[%s] ERROR in module 'loadfile': '%s' contains no platform page." % (MODULE_NAME, filename)
+			return None
+		platform = sub(r"^\s*openatv\s*|\s*build\s*status\s*$", "", htmldict.get("title", ""), flags=I) or basename(filename)
+		self.cancel()
+		self.url = None
+		self.platform = platform
+		self.htmldict = htmldict
+		self.clock = timestamp or self.datatime(htmldict) or getmtime(filename)  # forecasts are calculated for the time of the data, not for now
+		self.forecastcache = (None, 0, {})
+		self.age = 0
+		self.stale = False
+		self.recordhistory(platform, htmldict)  # replaying several files in chronological order builds up the history
+		self.index.update(platform, htmldict)
+		return htmldict
+
+	def datatime(self, htmldict):  # newest time found in the rows (HTML captures carry no timestamp), None if there is none
+		times = [parsetimestamp(bd[key]) for bd in htmldict["boxinfo"].values() for key in ("StartBuild", "StartFeedSync", "EndBuild")]
+		return max((timestamp for timestamp in times if timestamp is not None), default=None)
+
+	def createdict(self, callback=None, url=None, platform=None, rowcallback=None, generation=None):  # coordinates 'get html-imagesdata & create imagesdict'
+		url = url or self.url
+		platform = platform or self.platform
+		if callback:
+			if generation != self.generation:  # superseded while waiting for a thread
+				return None
+			print("[%s] accessing buildservers for data..." % MODULE_NAME)
+
+		def streamrow(boxname, record):
+			if generation is not None and generation != self.generation:
+				raise Cancelled
+			if rowcallback:
+				rowcallback(boxname, record)
+
+		htmldict = None
+		error = None
+		age, stale = 0, False
+		if url:
+			try:
+				htmldict, error, age, stale = self.getdata(url, "getpage", partial(self.pageparse, url), streamrow)  # complete dict of all platform boxes
+			except Cancelled:
+				print("[%s] request for '%s' superseded, download cancelled..." % (MODULE_NAME, platform))
+				return None
+			if htmldict:
+				self.recordhistory(platform, htmldict)
+				self.index.update(platform, htmldict)
 		else:
-			self.htmldict = None
-			self.error = "[%s] ERROR in module 'getpage': htmldata is None." % MODULE_NAME
+			error = "[%s] ERROR in module 'getpage': missing url" % MODULE_NAME
 		if callback:
-			if not self.error:
+			if not error:
 				print("[%s] buildservers successfully accessed..." % MODULE_NAME)
+			from twisted.internet.reactor import callFromThread
+			callFromThread(self.deliver, callback, url, platform, htmldict, error, age, stale, generation)  # shared data is only changed in the main thread
+			return None
+		self.deliver(None, url, platform, htmldict, error, age, stale, generation)
+		return None if error else htmldict
+
+	def deliver(self, callback, url, platform, htmldict, error, age, stale, generation):  # results of superseded requests are discarded
+		if generation is not None and generation != self.generation:
+			return
+		self.url = url
+		self.platform = platform
+		self.htmldict = htmldict
+		self.error = error
+		self.age = age
+		self.stale = stale
+		self.clock = None
+		if callback:
 			callback()
-		return None if self.error else self.htmldict
 
-	def htmlparse(self, htmldata):  # parse html-imagesdata & create imagesdict
+	def jsonparse(self, response, rowcallback=None):
+		return loads(response.content)
+
+	def pageparse(self, url, response, rowcallback=None):  # parses the rows while the page is streamed, the complete page is never held in memory
+		stream = Pagestream(response)
+		boxinfo, rows = self.rowsparse(stream.rows(), url, rowcallback)
+		htmldict = self.headparse("".join(stream.outside))
+		htmldict["boxinfo"] = boxinfo
+		htmldict["rows"] = rows
+		return htmldict
+
+	def htmlparse(self, htmldata, url=None):  # parse html-imagesdata & create imagesdict, rows unchanged since last parse of url are reused
+		htmldict = self.headparse(htmldata)
+		datablocks = search(r"<tbody>(.*?)</tbody>", htmldata, flags=S)
+		datablocks = datablocks.group(1) if datablocks else None
+		datablocks = findall(r"\s*<tr>(.*?)</tr>\s*", datablocks, flags=S) if datablocks else []
+		htmldict["boxinfo"], htmldict["rows"] = self.rowsparse(datablocks, url)
+		return htmldict
+
+	def headparse(self, htmldata):  # parse everything except the rows
 		htmldict = dict()
 		title = search(r'<title>(.*?)</title>', htmldata)
 		headline = findall(r"<th>(.*?)</th>", str(findall(r'<thead>\s*<tr>(.*?)</tr>\s*</thead>', htmldata, flags=S)))
@@ -124,25 +690,45 @@ class Buildstatus():
 		for idx, version in enumerate(versionnames):
 			htmldict["versionurls"][version] = dict()
 			htmldict["versionurls"][version]["url"] = versionurls[idx]
-		datablocks = search(r"<tbody>(.*?)</tbody>", htmldata, flags=S)
-		datablocks = datablocks.group(1) if datablocks else None
-		datablocks = findall(r"\s*<tr>(.*?)</tr>\s*", datablocks, flags=S) if datablocks else []
-		htmldict["boxinfo"] = dict()
-		for datablock in datablocks:
-			boxinfo = findall(r'<td\s*class="(.*?)">(.*?)</td>', datablock, flags=M)
-			dateset = findall(r'<td>(.*?)</td>', datablock)
-			boxname = boxinfo[0][1]
-			htmldict["boxinfo"][boxname] = dict()  # boxname
-			htmldict["boxinfo"][boxname]["BoxNameClass"] = boxinfo[0][0]
-			htmldict["boxinfo"][boxname]["BuildStatus"] = boxinfo[1][1]
-			htmldict["boxinfo"][boxname]["BuildClass"] = boxinfo[1][0]
-			htmldict["boxinfo"][boxname]["StartBuild"] = dateset[0]
-			htmldict["boxinfo"][boxname]["StartFeedSync"] = dateset[1]
-			htmldict["boxinfo"][boxname]["EndBuild"] = dateset[2]
-			htmldict["boxinfo"][boxname]["SyncTime"] = dateset[3]
-			htmldict["boxinfo"][boxname]["BuildTime"] = dateset[4]
 		return htmldict
 
+	def rowsparse(self, datablocks, url=None, rowcallback=None):  # returns (boxinfo, rows), datablocks may also be a generator of streamed rows
+		boxinfo = dict()
+		rowcache = self.rowcache.get(url, {}) if url else {}
+		newcache = dict()
+		rows = {"reused": [], "changed": []}
+		for datablock in datablocks:
+			fingerprint = hash(datablock)  # the complete text of a row is its fingerprint
+			cached = rowcache.get(fingerprint)
+			if cached:
+				boxname, record = cached
+				rows["reused"].append(boxname)
+			else:
+				boxname, record = self.rowparse(datablock)
+				rows["changed"].append(boxname)
+			boxinfo[boxname] = record
+			newcache[fingerprint] = (boxname, record)
+			if rowcallback:
+				rowcallback(boxname, record)
+		rows["removed"] = [cached[0] for cached in rowcache.values() if cached[0] not in boxinfo]
+		if url:
+			self.rowcache[url] = newcache
+		return boxinfo, rows
+
+	def rowparse(self, datablock):  # returns (boxname, record) of a single row
+		boxinfo = findall(r'<td\s*class="(.*?)">(.*?)</td>', datablock, flags=M)
+		dateset = findall(r'<td>(.*?)</td>', datablock)
+		record = dict()
+		record["BoxNameClass"] = boxinfo[0][0]
+		record["BuildStatus"] = boxinfo[1][1]
+		record["BuildClass"] = boxinfo[1][0]
+		record["StartBuild"] = dateset[0]
+		record["StartFeedSync"] = dateset[1]
+		record["EndBuild"] = dateset[2]
+		record["SyncTime"] = dateset[3]
+		record["BuildTime"] = dateset[4]
+		return boxinfo[0][1], record
+
 	def findbuildbox(self):  # find boxname current image is build for
 		if self.htmldict is None:
 			self.error = "[%s] ERROR in module 'findbuildbox': '%s" % (MODULE_NAME, "self.htmldict is None")
@@ -155,6 +741,138 @@ class Buildstatus():
 				break
 		return hit
 
+	def recordhistory(self, platform, htmldict):  # collects the durations (build + sync) of finished builds
+		if self.history is None:
+			self.history = dict()
+			if self.snapshotdir:
+				try:
+					with open(join(self.snapshotdir, "history.json"), "r") as f:
+						self.history = load(f)
+				except (OSError, ValueError):
+					pass
+		changed = False
+		history = self.history.setdefault(platform, dict())
+		indexed = self.index.platforms.get(platform, {})
+		for boxname, bd in htmldict["boxinfo"].items():
+			if bd is indexed.get(boxname):  # reused record of an unchanged row, can't contain a newly finished build
+				continue
+			buildtime = parseduration(bd["BuildTime"])
+			boxhistory = history.setdefault(boxname, {"end": None, "durations": []})
+			if buildtime is not None and "Building" not in bd["BuildStatus"] and bd["EndBuild"] != boxhistory["end"]:
+				boxhistory["end"] = bd["EndBuild"]
+				boxhistory["durations"] = (boxhistory["durations"] + [buildtime + (parseduration(bd["SyncTime"]) or 0)])[-HISTORYSIZE:]
+				changed = True
+		if changed and self.snapshotdir:
+			try:
+				makedirs(self.snapshotdir, exist_ok=True)
+				filename = join(self.snapshotdir, "history.json")
+				with open("%s.tmp" % filename, "w") as f:
+					dump(self.history, f)
+				replace("%s.tmp" % filename, filename)  # atomic, readers never see a partly written history
+			except OSError as err:
+				print("[%s] WARNING in module 'recordhistory': %s" % (MODULE_NAME, str(err)))
+
+	def getplatformdict(self, platform):  # htmldict of any platform already fetched
+		if platform == self.platform and self.htmldict:
+			return self.htmldict
+		url = self.platdict.get("versionurls", {}).get(platform, {}).get("url")
+		snapshot = self.loadsnapshot(url) if url else None
+		return snapshot[1] if snapshot else None
+
+	def forecast(self, box=None):  # forecast of current platform: {"cycletime": ..., "boxes": {boxname: {...}}} or forecast of box only
+		key = (self.platform, id(self.htmldict))
+		if self.forecastcache[0] != key or time() - self.forecastcache[1] > 60:  # recalculate for new data or elapsed build time
+			self.forecastcache = (key, time(), self.forecastall([self.platform]).get(self.platform, {}) if self.platform else {})
+		forecasts = self.forecastcache[2]
+		return forecasts.get("boxes", {}).get(box) if box else forecasts
+
+	def forecastall(self, platforms=None):  # forecasts for every box of every platform in one pass
+		now = self.clock or time()
+		boxnames, samples, segments = [], [], []  # segments: (platform, start, count, buildidx, elapsed)
+		for platform in platforms or self.platlist:
+			htmldict = self.getplatformdict(platform)
+			if not htmldict or not htmldict["boxinfo"]:
+				continue
+			history = (self.history or {}).get(platform, {})
+			start = len(boxnames)
+			buildidx, elapsed = 0, 0
+			for idx, (boxname, bd) in enumerate(htmldict["boxinfo"].items()):
+				boxnames.append(boxname)
+				durations = history.get(boxname, {}).get("durations")
+				if not durations:  # no history yet: take duration of the last build
+					buildtime = parseduration(bd["BuildTime"])
+					durations = [] if buildtime is None else [buildtime + (parseduration(bd["SyncTime"]) or 0)]
+				samples.append(durations)
+				if "Building" in bd["BuildStatus"]:
+					buildidx = idx
+					started = parsetimestamp(bd["StartBuild"])
+					elapsed = max(0, now - started) if started else 0
+			segments.append((platform, start, len(boxnames) - start, buildidx, elapsed))
+		if not boxnames:
+			return {}
+		calculate = self.calculatenumpy if numpy else self.calculatepython
+		median, eta, etavariance, cycle, cyclevariance = calculate(samples, segments)
+		forecasts = dict()
+		for segidx, (platform, start, count, buildidx, elapsed) in enumerate(segments):
+			boxes = dict()
+			for idx in range(start, start + count):
+				spread = BANDSIGMA * etavariance[idx] ** 0.5
+				boxes[boxnames[idx]] = {"duration": int(median[idx]), "position": (idx - start - buildidx) % count, "eta": int(eta[idx]),
+										"etalow": int(max(0, eta[idx] - spread)), "etahigh": int(eta[idx] + spread), "expected": int(now + eta[idx])}
+			spread = BANDSIGMA * cyclevariance[segidx] ** 0.5
+			forecasts[platform] = {"cycletime": int(cycle[segidx]), "cyclelow": int(max(0, cycle[segidx] - spread)), "cyclehigh": int(cycle[segidx] + spread), "boxes": boxes}
+		return forecasts
+
+	def calculatenumpy(self, samples, segments):  # same as 'calculatepython' with array operations over the whole fleet
+		width = max(1, max(len(durations) for durations in samples))
+		matrix = numpy.full((len(samples), width), numpy.nan)
+		lengths = numpy.array([len(durations) for durations in samples])
+		matrix[numpy.arange(width) < lengths[:, None]] = numpy.fromiter((value for durations in samples for value in durations), float, lengths.sum())
+		missing = lengths == 0
+		matrix[missing, 0] = 0  # avoids warnings about empty rows, they are replaced below
+		low, median, high = numpy.nanpercentile(matrix, [10, 50, 90], axis=1)
+		starts, counts, buildidxs, elapsed = (numpy.array([seg[col] for seg in segments]) for col in (1, 2, 3, 4))
+		segid = numpy.repeat(numpy.arange(len(segments)), counts)  # platform of each box
+		known = numpy.bincount(segid, weights=~missing, minlength=len(segments))
+		fallback = numpy.bincount(segid, weights=numpy.where(missing, 0, median), minlength=len(segments)) / numpy.maximum(known, 1)
+		median = numpy.where(missing, fallback[segid], median)  # unknown boxes get the average duration of their platform
+		low = numpy.minimum(numpy.where(missing, median, low), 0.9 * median)  # at least +-10% uncertainty
+		high = numpy.maximum(numpy.where(missing, median, high), 1.1 * median)
+		variance = ((high - low) / (2 * BANDSIGMA)) ** 2
+		position = (numpy.arange(len(samples)) - starts[segid] - buildidxs[segid]) % counts[segid]
+		order = numpy.lexsort((position, segid))  # queue order within each platform, starting with the box being built
+		first = starts + buildidxs
+		contribution = median.copy()
+		contribution[first] = numpy.maximum(median[first] - elapsed, 0)  # remaining time of current build
+		eta = numpy.empty(len(samples))
+		etavariance = numpy.empty(len(samples))
+		for target, source in ((eta, contribution), (etavariance, variance)):
+			cumulated = numpy.cumsum(source[order])
+			base = numpy.concatenate(([0], cumulated))[starts]  # cumulated sum of all previous platforms
+			target[order] = cumulated - base[segid[order]]
+		cycle = numpy.bincount(segid, weights=median, minlength=len(segments))
+		cyclevariance = numpy.bincount(segid, weights=variance, minlength=len(segments))
+		return median, eta, etavariance, cycle, cyclevariance
+
+	def calculatepython(self, samples, segments):
+		median, variance = [], []
+		for platform, start, count, buildidx, elapsed in segments:
+			known = [percentiles(durations) for durations in samples[start:start + count] if durations]
+			fallback = sum(item[1] for item in known) / len(known) if known else 0
+			for durations in samples[start:start + count]:
+				low, med, high = percentiles(durations) if durations else (fallback, fallback, fallback)
+				median.append(med)
+				variance.append(((max(high, 1.1 * med) - min(low, 0.9 * med)) / (2 * BANDSIGMA)) ** 2)
+		eta, etavariance, cycle, cyclevariance = [0] * len(median), [0] * len(median), [], []
+		for platform, start, count, buildidx, elapsed in segments:
+			order = [start + (buildidx + idx) % count for idx in range(count)]
+			contribution = [max(median[order[0]] - elapsed, 0)] + [median[idx] for idx in order[1:]]
+			for idx, value, var in zip(order, accumulate(contribution), accumulate(variance[idx] for idx in order)):
+				eta[idx], etavariance[idx] = value, var
+			cycle.append(sum(median[start:start + count]))
+			cyclevariance.append(sum(variance[start:start + count]))
+		return median, eta, etavariance, cycle, cyclevariance
+
 	def evaluate(self, box=None):  # evaluate box data
 		if self.htmldict is None:
 			self.error = "[%s] ERROR in module 'evaluate': '%s" % (MODULE_NAME, "self.htmldict is None")
@@ -211,24 +929,42 @@ def main(argv):  # shell interface
 	architectures = False
 	platforms = False
 	currarch = "ARM"
+	archgiven = False
+	find = None
 	filename = None
+	hub = None
+	mirrors = []
 	boxname = None
-	cycletime = None
-	counter = 0
-	failed = 0
+	replay = None  # [(filename, html)] of offline input, None = access the build server
+	failures = 0  # replayed files that could not be read
 	helpstring = "Buildstatus v1.2: try 'python Buildstatus.py -h' for more information"
 
-	BS = Buildstatus()
-	BS.start()  # interactive call without threading
-	if BS.error:
-		print(BS.error.replace(mainfmt, "").strip())
-		exit()
 	try:
-		opts, args = getopt(argv, "a:j:e:bcvsph", ["architecture =", "json =", "evaluate =", "buildbox", "cycle", "verbose", "supported", "platforms", "help"])
+		opts, args = getopt(argv, "a:j:e:u:m:f:bcvsph", ["architecture =", "json =", "evaluate =", "hub =", "mirror =", "find =", "from-json =", "from-html =", "stats", "buildbox", "cycle", "verbose", "supported", "platforms", "help"])
 	except GetoptError:
 		print(helpstring)
 		exit(2)
-	if not opts:
+	for opt, arg in opts:
+		opt = opt.lower().strip()
+		if opt in ("-u", "--hub"):
+			hub = arg.strip()
+		elif opt in ("-m", "--mirror"):
+			mirrors.append(arg.strip())
+		elif opt in ("--from-json", "--from-html"):  # filenames are case sensitive
+			files = replayfiles(arg.strip(), opt == "--from-html")
+			if not files:
+				print("ERROR in module 'main': no files to replay found in '%s'" % arg.strip())
+				failures += 1
+			replay = (replay or []) + files
+	if replay is not None:
+		BS = Buildstatus(snapshotdir=None)  # no network access, no changes to the snapshots of the plugin
+	else:
+		BS = Buildstatus(hub=hub, mirrors=mirrors)
+		BS.start()  # interactive call without threading
+		if BS.error:
+			print(BS.error.replace(mainfmt, "").strip())
+			exit()
+	if not opts or all(opt.strip() in ("--from-json", "--from-html") for opt, arg in opts):  # getopt returns long options with the trailing space of their spec
 		verbose = True
 	for opt, arg in opts:
 		opt = opt.lower().strip()
@@ -239,13 +975,22 @@ def main(argv):  # shell interface
 			"-b, --buildbox\t\t\tShow the box for which currently built an image\n"
 			"-c, --cycle\t\t\tShow the estimated duration of a complete build cycle\n"
 			"-v, --verbose\t\t\tPerform with complete image build status overview\n"
-			"-e, --evaluate <boxname>\tevaluates time until image will be build for desired box\n"
+			"-e, --evaluate <boxname>\tevaluates time until image will be build for desired box (on any architecture)\n"
+			"-f, --find <text>\t\tFind boxes on all architectures whose name contains text\n"
 			"-s, --supported\t\t\tShow all currently supported architectures\n"
 			"-p, --platforms\t\t\tShow all currently supported platforms\n"
-			"-j, --json <filename>\t\tFile output formatted in JSON" % ", ".join(BS.archlist))
+			"-j, --json <filename>\t\tFile output formatted in JSON\n"
+			"-u, --hub <url>\t\t\tUse a hub as data source, e.g. 'http://192.168.0.10:8780' (see Buildhub.py)\n"
+			"--stats\t\t\t\tShow queue depth, wait time and shed requests of the request scheduler on exit\n"
+			"-m, --mirror <url>\t\tAlso request the build server data from this mirror, the fastest answer is taken (repeatable)\n"
+			"--from-json <file|directory>\tReplay JSON exports (-j) or snapshots offline instead of accessing the build server\n"
+			"--from-html <file|directory>\tReplay raw HTML captures of platform pages offline\n"
+			"\t\t\t\tDirectories and repeated options are replayed in one batch (files in alphabetical order),\n"
+			"\t\t\t\t-a restricts the batch to one architecture" % ", ".join(BS.archlist))
 			exit()
 		elif opt in ("-a", "--architecture"):
 			currarch = arg.upper()
+			archgiven = True
 			verbose = True
 		elif opt in ("-j", "--json"):
 			filename = arg
@@ -262,11 +1007,89 @@ def main(argv):  # shell interface
 			architectures = True
 		elif opt in ("-p", "--platforms"):
 			platforms = True
-	currplat = BS.getplatform(currarch)
+		elif opt in ("-f", "--find"):
+			find = arg
+		elif opt == "--stats":
+			register(printstats)
+	if replay is not None:
+		for replayfile, html in replay:
+			if not BS.loadfile(replayfile, html):
+				print(BS.error.replace(mainfmt, "").strip())
+				failures += 1
+				continue
+			if find or (archgiven and BS.platform.split(" ")[0].upper() != currarch):
+				continue
+			outfile = filename
+			if len(replay) > 1:
+				print("%s: %s" % (replayfile, BS.platform))
+				if filename:  # one export per replayed file: 'out.json' -> 'out_<replayed file>.json'
+					outfile = "%s_%s%s" % (splitext(filename)[0], splitext(basename(replayfile))[0], splitext(filename)[1] or ".json")
+			report(BS, BS.platform, buildbox, evaluate, boxname, cycle, verbose, outfile)
+	if architectures:
+		if BS.error:
+			print(BS.error.replace(mainfmt, "").strip())
+		if architectures:
+			print("available architectures: %s" % ", ".join(x for x in BS.archlist))
+		else:
+			print("ERROR in module 'main': no architectures found")
+	if platforms:
+		if BS.error:
+			print(BS.error.replace(mainfmt, "").strip())
+		if platforms:
+			print("available platforms: %s" % ", ".join(x for x in BS.platlist))
+		else:
+			print("ERROR in module 'main': no platforms found")
+	if find:
+		index = BS.indexall()
+		found = index.search(find)
+		for box in found:
+			print("%s: %s" % (box, ", ".join("%s (%s, position %s)" % (platform, status.strip(), position) for platform, (status, position) in index.lookup(box).items())))
+		if not found:
+			print("no box found containing '%s'" % find)
+		exit(1 if failures else 0)
+	if replay is not None:
+		exit(1 if failures else 0)
+	currplat = BS.findplatform(boxname) if evaluate and boxname and not archgiven else None
+	currplat = currplat or BS.getplatform(currarch)
 	if not currplat:
 		print("ERROR in module 'main': unknown architecture. Allowed is: %s" % ", ".join(x.split(" ")[0].upper() for x in BS.archlist))
 		exit()
-	BS.getbuildinfos(currplat)
+	if BS.platform != currplat or BS.htmldict is None:  # not yet fetched by 'findplatform'
+		BS.getbuildinfos(currplat)
+	report(BS, currplat, buildbox, evaluate, boxname, cycle, verbose, filename)
+
+
+def printstats():  # counters of the request scheduler
+	for name, counters in SCHEDULER.getstats().items():
+		average = counters["waittime"] / counters["sent"] if counters["sent"] else 0
+		print("%s requests: %s sent, %s shed, queue depth %s (max %s), average wait %.3f s (max %.3f s)" % (name, counters["sent"], counters["shed"], counters["depth"], counters["maxdepth"], average, counters["maxwait"]))
+
+
+def replayfiles(path, html=False):  # [(filename, html)] of a file or of all matching files of a directory
+	if not isdir(path):
+		return [(path, html)]
+	extensions = (".html", ".htm") if html else (".json",)
+	filenames = [join(path, filename) for filename in sorted(listdir(path)) if filename.lower().endswith(extensions) and filename != "history.json"]
+	return [(filename, html) for filename in filenames if html or not platformless(filename)]
+
+
+def platformless(filename):  # True for readable JSON without a platform page, e.g. the snapshot of content.json, unreadable files are replayed to report them
+	try:
+		with open(filename, "r") as f:
+			data = load(f)
+	except (OSError, ValueError):
+		return False
+	data = data[1] if isinstance(data, list) and len(data) == 2 else data  # snapshot: [timestamp, data]
+	return not (isinstance(data, dict) and "boxinfo" in data)
+
+
+def report(BS, currplat, buildbox, evaluate, boxname, cycle, verbose, filename):  # prints the results of the current platform
+	mainfmt = "[__main__]"
+	cycletime = None
+	counter = 0
+	failed = 0
+	if BS.stale:
+		print("WARNING: build server is not reachable, showing data from %s h ago." % BS.strf_delta(timedelta(seconds=BS.age)))
 	if buildbox:
 		buildboxname = BS.findbuildbox()
 		if buildboxname:
@@ -279,6 +1102,9 @@ def main(argv):  # shell interface
 			nextbuild, boxesahead, cycletime, counter, failed = BS.evaluate(boxname)
 			if nextbuild is not None:
 				print("estimated time for next image '%s': %s h (%s boxes ahead)" % (boxname, BS.strf_delta(nextbuild), boxesahead))
+			forecast = BS.forecast(boxname)
+			if forecast:
+				print("forecast from recent build durations: %s h (%s h - %s h), expected at %s" % (BS.strf_delta(timedelta(seconds=forecast["eta"])), BS.strf_delta(timedelta(seconds=forecast["etalow"])), BS.strf_delta(timedelta(seconds=forecast["etahigh"])), datetime.fromtimestamp(forecast["expected"]).strftime("%Y-%m-%d %H:%M")))
 			if BS.error:
 				print(BS.error.replace(mainfmt, "").strip())
 				BS.error = None
@@ -290,29 +1116,17 @@ def main(argv):  # shell interface
 			nextbuild, boxesahead, cycletime, counter, failed = BS.evaluate()
 		if cycletime:
 			print("estimated durance of complete cycle (%s): %s h" % (currplat, BS.strf_delta(cycletime)))
+		forecast = BS.forecast()
+		if forecast:
+			print("forecast from recent build durations: %s h (%s h - %s h)" % (BS.strf_delta(timedelta(seconds=forecast["cycletime"])), BS.strf_delta(timedelta(seconds=forecast["cyclelow"])), BS.strf_delta(timedelta(seconds=forecast["cyclehigh"]))))
 		if BS.error:
 			print(BS.error.replace(mainfmt, "").strip())
 			BS.error = None
-	if architectures:
-		if BS.error:
-			print(BS.error.replace(mainfmt, "").strip())
-		if architectures:
-			print("available architectures: %s" % ", ".join(x for x in BS.archlist))
-		else:
-			print("ERROR in module 'main': no architectures found")
-	if platforms:
-		if BS.error:
-			print(BS.error.replace(mainfmt, "").strip())
-		if platforms:
-			print("available platforms: %s" % ", ".join(x for x in BS.platlist))
-		else:
-			print("ERROR in module 'main': no platforms found")
-
 	if BS.htmldict and verbose:
 		separator = "+--------------------+--------------+----------------------+----------------------+----------------------+-----------+------------+"
 		row = "| {0:<18} | {1:<12} | {2:<20} | {3:<20} | {4:<20} | {5:<9} | {6:<10} |"
 		print("%s%s%s" % ("+", "-" * 129, "+"))
-		print("| {0:<128}|".format(BS.htmldict["title"]))
+		print("| {0:<128}|".format("%s%s" % (BS.htmldict["title"], " [STALE: %s h old]" % BS.strf_delta(timedelta(seconds=BS.age)) if BS.stale else "")))
 		print(separator)
 		print(row.format(*BS.htmldict["headline"].split(", ")))
 		print(separator)
@@ -323,8 +1137,9 @@ def main(argv):  # shell interface
 		print("| {0:<50}{1:<48}{2:<30}|".format("current platform: %s" % currplat.upper(), "boxes found: %s" % counter, "building errors found: %s" % str(failed).rjust(3)))
 		print("%s%s%s" % ("+", "-" * 129, "+"))
 	if BS.htmldict and filename:
+		timestamp = BS.clock or (BS.snapshots.get(BS.url) or (time(),))[0]  # replays of the export forecast for this time
 		with open(filename, "w") as f:
-			dump(BS.htmldict, f)
+			dump(dict(BS.htmldict, timestamp=timestamp), f)
 		print("File '%s' was successfully created." % filename)
 
 
@@ -0,0 +1,131 @@
+#########################################################################################################
+#                                                                                                       #
+#  Thumbnails for openATV: box pictures are downscaled once to the sizes the skins actually show        #
+#  Coded by Mr.Servo @ openATV (c) 2023                                                                 #
+#  Learn more about the tool by running it in the shell: "python Thumbnails.py -h"                      #
+#  -----------------------------------------------------------------------------------------------------#
+#  This plugin is licensed under the GNU version 3.0 <https://www.gnu.org/licenses/gpl-3.0.en.html>.    #
+#  This plugin is NOT free software. It is open source, you are allowed to modify it (if you keep       #
+#  the license), but it may not be commercially distributed. Advertise with this tool is not allowed.   #
+#  For other uses, permission from the authors is necessary.                                            #
+#                                                                                                       #
+#########################################################################################################
+
+# PYTHON IMPORTS
+from getopt import getopt, GetoptError
+from glob import glob
+from os import replace
+from os.path import join, exists, getmtime, splitext
+from re import match
+from sys import exit, argv
+try:
+	from PIL import Image  # optional: without Pillow the original pictures are shown and scaled at draw time
+except ImportError:
+	Image = None
+
+MODULE_NAME = __name__.split(".")[-1]
+# {resolution: {usage: ((width, height), keep aspect ratio)}}, sizes as given in skin_HD.xml & skin_fHD.xml
+THUMBSIZES = {"HD": {"list": ((166, 42), False), "details": ((646, 233), True)},
+			"fHD": {"list": ((250, 64), False), "details": ((970, 350), True)}}
+UNSCALABLE = dict()  # {picfile: mtime} of pictures no thumbnail can be made of, they are shown as original
+
+
+def thumbfile(picfile, size):  # thumbnails are stored next to the original: 'boxname_166x42.png'
+	return "%s_%sx%s.png" % (splitext(picfile)[0], size[0], size[1])
+
+
+def getthumbnail(picfile, resolution, usage):  # returns the up to date thumbnail, the original without Pillow, otherwise None
+	if not exists(picfile):
+		return None
+	thumb = thumbfile(picfile, THUMBSIZES[resolution][usage][0])
+	if exists(thumb) and getmtime(thumb) >= getmtime(picfile):
+		return thumb
+	if Image is None or UNSCALABLE.get(picfile) == getmtime(picfile):
+		return picfile
+	return None  # thumbnail has to be created first
+
+
+def makethumbnails(picfile, resolution):  # creates all thumbnails of the resolution, returns False if only the original can be used
+	if Image is None or not exists(picfile):
+		return False
+	try:
+		with Image.open(picfile) as picture:
+			picture = picture.convert("RGBA")
+			for size, keepaspect in THUMBSIZES[resolution].values():
+				thumb = thumbfile(picfile, size)
+				if exists(thumb) and getmtime(thumb) >= getmtime(picfile):
+					continue
+				if keepaspect:
+					thumbnail = picture.copy()
+					thumbnail.thumbnail(size, Image.LANCZOS)  # never enlarges, the skin centers smaller pictures
+				else:
+					thumbnail = picture.resize(size, Image.LANCZOS)  # same result as BT_SCALE at draw time
+				tmpfile = "%s.tmp" % thumb
+				thumbnail.save(tmpfile, "PNG", optimize=True)
+				replace(tmpfile, thumb)  # atomic: readers never get an incomplete thumbnail
+	except Exception as err:
+		print("[%s] ERROR in module 'makethumbnails': %s" % (MODULE_NAME, str(err)))
+		UNSCALABLE[picfile] = getmtime(picfile)  # until the picture is replaced
+		return False
+	return True
+
+
+def pixmapsize(picfile):  # memory of a decoded pixmap in bytes (32 bits per pixel)
+	with Image.open(picfile) as picture:
+		return picture.size[0] * picture.size[1] * 4
+
+
+def measure(picdir, resolution, favorites):  # compares pixmap memory of originals and thumbnails for a number of favorites
+	picfiles = sorted(picfile for picfile in glob(join(picdir, "*.png")) if not match(r".*_\d+x\d+$", splitext(picfile)[0]))  # originals only
+	if not picfiles:
+		return None
+	original = 0
+	thumbnails = 0
+	for idx in range(favorites):  # pictures are repeated if there are less pictures than favorites
+		picfile = picfiles[idx % len(picfiles)]
+		makethumbnails(picfile, resolution)
+		original += pixmapsize(picfile)
+		thumbnails += pixmapsize(getthumbnail(picfile, resolution, "list"))
+	return {"pictures": len(picfiles), "favorites": favorites, "original": original, "thumbnails": thumbnails}
+
+
+def main(argv):  # shell interface
+	picdir = "/tmp/boxpictures/"
+	resolution = "HD"
+	favorites = 60
+	helpstring = "Thumbnails v1.0: try 'python Thumbnails.py -h' for more information"
+	try:
+		opts, args = getopt(argv, "d:r:n:h", ["directory =", "resolution =", "number =", "help"])
+	except GetoptError:
+		print(helpstring)
+		exit(2)
+	for opt, arg in opts:
+		opt = opt.lower().strip()
+		arg = arg.strip()
+		if opt == "-h":
+			print("Usage: python Thumbnails.py [options...] <data>\n"
+			"-d, --directory <path>\t\tCreate thumbnails of all box pictures in this directory {/tmp/boxpictures/ is default}\n"
+			"-r, --resolution <HD|fHD>\tUse the sizes of this skin {HD is default}\n"
+			"-n, --number <favorites>\tMeasure the memory of the favorites list with this number of favorites {60 is default}")
+			exit()
+		elif opt in ("-d", "--directory"):
+			picdir = arg
+		elif opt in ("-r", "--resolution"):
+			resolution = "fHD" if arg.lower() == "fhd" else "HD"
+		elif opt in ("-n", "--number"):
+			favorites = int(arg)
+	if Image is None:
+		print("[%s] ERROR in module 'main': Pillow is not installed, thumbnails can't be created." % MODULE_NAME)
+		exit(1)
+	result = measure(picdir, resolution, favorites)
+	if not result:
+		print("[%s] ERROR in module 'main': no box pictures found in '%s'." % (MODULE_NAME, picdir))
+		exit(1)
+	print("%s favorites (%s different pictures), %s skin:" % (result["favorites"], result["pictures"], resolution))
+	print("pixmap memory of originals:\t%.1f MB" % (result["original"] / 1048576))
+	print("pixmap memory of thumbnails:\t%.1f MB" % (result["thumbnails"] / 1048576))
+	print("memory saved:\t\t\t%.1f MB (%.1f%%)" % ((result["original"] - result["thumbnails"]) / 1048576, 100 - result["thumbnails"] * 100 / result["original"]))
+
+
+if __name__ == "__main__":
+	main(argv[1:])
@@ -11,17 +11,16 @@
 #########################################################################################################
 
 # PYTHON IMPORTS
-from datetime import datetime
+from datetime import datetime, timedelta
 from json import loads
+from time import time
 from os import makedirs
-from os.path import join, exists
-from requests import get, exceptions
-from xml.etree.ElementTree import tostring, parse
+from os.path import join, exists, getmtime
 
 # ENIGMA IMPORTS
 from enigma import getDesktop, eTimer, getPeerStreamingBoxes, BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_HALIGN_CENTER, BT_VALIGN_CENTER
 from Components.ActionMap import ActionMap
-from Components.config import config, ConfigSubsection, ConfigSelection, ConfigText, getConfigListEntry
+from Components.config import config, ConfigSubsection, ConfigSelection, ConfigText, ConfigYesNo, getConfigListEntry
 from Components.ConfigList import ConfigListScreen
 from Components.Label import Label
 from Components.Pixmap import Pixmap
@@ -31,44 +30,227 @@ from Plugins.Plugin import PluginDescriptor
 from Screens.Screen import Screen
 from Screens.MessageBox import MessageBox
 from Tools.LoadPixmap import LoadPixmap
-from twisted.internet.reactor import callInThread
+from twisted.internet.reactor import callInThread, callFromThread
 
 # PLUGIN IMPORTS
 from . import PLUGINPATH, _  # for localized messages
-from .Buildstatus import Buildstatus
 
 # PLUGIN GLOBALS
-BS = Buildstatus()
-BS.start()
+BS = None  # Buildstatus is loaded on first use, see 'initBuildstatus'
+HUB = None  # Buildhub is only loaded if this box serves data to other receivers
 
 config.plugins.OpenATVstatus = ConfigSubsection()
 config.plugins.OpenATVstatus.animate = ConfigSelection(default="50", choices=[("off", _("off")), ("70", _("slower")), ("50", _("normal")), ("30", _("faster"))])
-config.plugins.OpenATVstatus.favarch = ConfigSelection(default="current", choices=[("current", _("selected box"))] + BS.archlist)
+config.plugins.OpenATVstatus.favarch = ConfigSelection(default="current", choices=[("current", _("selected box"))])  # architectures are added by 'initBuildstatus'
 config.plugins.OpenATVstatus.favboxes = ConfigText(default="", fixed_size=False)
+config.plugins.OpenATVstatus.hubserver = ConfigYesNo(default=False)
+config.plugins.OpenATVstatus.huburl = ConfigText(default="", fixed_size=False)
+config.plugins.OpenATVstatus.mirrors = ConfigText(default="", fixed_size=False)
 
 VERSION = "V1.3"
 MODULE_NAME = __name__.split(".")[-1]
 FAVLIST = [tuple(atom.strip() for atom in item.replace("(", "").replace(")", "").split(",")) for item in config.plugins.OpenATVstatus.favboxes.value.split(";")] if config.plugins.OpenATVstatus.favboxes.value else []
+FAVSET = set(FAVLIST)  # hashed favorites for fast membership tests, FAVLIST keeps the order
 PICURL = "https://raw.githubusercontent.com/oe-alliance/remotes/master/boxes/"
 TMPPATH = "/tmp/boxpictures/"
+IMPORTBUDGET = 0.1  # maximum time in seconds the import of this module may take, checked by 'tools/headless/importtime.py'
+STREAMBATCH = 10  # rows per progressive update of the images list while a page is loading
+DEBOUNCE = 400  # milliseconds without platform change before the images list is loaded
+SKINCACHE = dict()  # {resolution: (mtime of skinfile, {screenname: skintext})}
 
 
-def readSkin(skin):
-	skintext = ""
-	skinfile = join(PLUGINPATH, "skin_%s.xml" % ("fHD" if getDesktop(0).size().width() > 1300 else "HD"))
+def initBuildstatus():  # loads module Buildstatus and platform data from build server on first use only
+	global BS
+	if BS is None:
+		from .Buildstatus import Buildstatus
+		BS = Buildstatus(swr=True, hub=getHuburl(), mirrors=getMirrors())  # serve last good snapshots at once, they are refreshed in background
+		BS.start()
+		favarch = config.plugins.OpenATVstatus.favarch
+		favarch.setChoices([("current", _("selected box"))] + BS.archlist, default="current")
+		if favarch.saved_value in BS.archlist:  # restore saved value, it was unknown until now
+			favarch.value = favarch.saved_value
+	return BS
+
+
+def addFavorite(box):
+	FAVLIST.append(box)
+	FAVSET.add(box)
+	saveFavorites()
+
+
+def removeFavorite(box):
+	FAVLIST.remove(box)
+	FAVSET.discard(box)
+	saveFavorites()
+
+
+def saveFavorites():
+	config.plugins.OpenATVstatus.favboxes.value = ";".join("(%s)" % ",".join(item) for item in FAVLIST) if FAVLIST else ""
+	config.plugins.OpenATVstatus.favboxes.save()
+
+
+def getMirrors():  # base urls of build server mirrors, separated by commas in the settings
+	return [mirror.strip() for mirror in config.plugins.OpenATVstatus.mirrors.value.split(",") if mirror.strip()]
+
+
+def getHuburl():  # url of the hub used as data source, None = build server only
+	if config.plugins.OpenATVstatus.huburl.value.strip():
+		return config.plugins.OpenATVstatus.huburl.value.strip()
+	if config.plugins.OpenATVstatus.hubserver.value:
+		from .Buildhub import HUBPORT
+		return "http://127.0.0.1:%s" % HUBPORT
+	return None
+
+
+def getResolution():
+	return "fHD" if getDesktop(0).size().width() > 1300 else "HD"
+
+
+def getPicture(boxname, usage):  # returns the thumbnail of the box picture for usage ("list" or "details"), None if it has to be made first
+	from .Thumbnails import getthumbnail
+	return getthumbnail(join(TMPPATH, "%s.png" % boxname), getResolution(), usage)
+
+
+def makePicture(boxname):  # downloads a missing box picture and scales it once to the sizes of the skin
+	from .Thumbnails import makethumbnails
+	picfile = join(TMPPATH, "%s.png" % boxname)
+	if not exists(picfile):
+		downloadPicture(boxname)
+	makethumbnails(picfile, getResolution())
+
+
+def downloadPicture(boxname):  # box pictures are taken from the hub (if any), otherwise from github
+	from requests import exceptions
+	from .Buildstatus import SCHEDULER, PICTURES
+	huburl = getHuburl()
+	picurls = (["%s/pictures/" % huburl.rstrip("/")] if huburl else []) + [PICURL]
+	for picurl in picurls:
+		try:
+			response = SCHEDULER.get("%s%s.png" % (picurl, boxname), PICTURES, timeout=(3.05, 6))
+			response.raise_for_status()
+		except exceptions.RequestException as error:
+			print("[%s] ERROR in module 'downloadPicture': %s" % (MODULE_NAME, str(error)))
+		else:
+			with open(join(TMPPATH, "%s.png" % boxname), "wb") as f:
+				f.write(response.content)
+			break
+
+
+def staleInfo():  # label for outdated data served from snapshots
+	return " (%s)" % (_("data is %sh old") % BS.strf_delta(timedelta(seconds=BS.age))) if BS.stale else ""
+
+
+def readSkin(skin):  # serves screens from SKINCACHE, skinfile is only parsed again if it has been modified
+	resolution = getResolution()
+	skinfile = join(PLUGINPATH, "skin_%s.xml" % resolution)
+	try:
+		mtime = getmtime(skinfile)
+	except OSError as error:
+		print("[Skin] Error: Unexpected error opening skin file '%s'! (%s)" % (skinfile, error))
+		return ""
+	cached = SKINCACHE.get(resolution)
+	if not cached or cached[0] != mtime:
+		cached = (mtime, parseSkin(skinfile))
+		SKINCACHE[resolution] = cached
+	return cached[1].get(skin, "")
+
+
+def parseSkin(skinfile):  # returns all screens of skinfile as serialized strings
+	from xml.etree.ElementTree import tostring, parse
+	screens = dict()
 	try:
 		with open(skinfile, "r") as file:
 			try:
 				domskin = parse(file).getroot()
 				for element in domskin:
-					if element.tag == "screen" and element.attrib["name"] == skin:
-						skintext = tostring(element).decode()
-						break
+					if element.tag == "screen":
+						screens[element.attrib["name"]] = tostring(element).decode()
 			except Exception as error:
 				print("[Skin] Error: Unable to parse skin data in '%s' - '%s'!" % (skinfile, error))
 	except OSError as error:
 		print("[Skin] Error: Unexpected error opening skin file '%s'! (%s)" % (skinfile, error))
-	return skintext
+	return screens
+
+
+class PeerProbe():
+	def __init__(self, ttl=300, negttl=60):
+		self.ttl = ttl  # lifetime of cached answers from online peers (seconds)
+		self.negttl = negttl  # lifetime of cached 'offline' results (seconds)
+		self.cache = dict()  # {apiurl: (timestamp, apidata or None)}
+		self.pending = set()  # apiurls currently being probed
+		self.callbacks = dict()  # {apiurl: [(boxname, callback), ...]}
+
+	def getapiurl(self, boxname):  # find apiurl of peer, example streamurls: ['http://gbue4k.local:8001', 'http://sf8008.local:8001']
+		streamurl = [x for x in getPeerStreamingBoxes() or [] if boxname in x]
+		return "%s:80/api/about" % streamurl[0][:streamurl[0].rfind(":")] if streamurl else None
+
+	def probe(self, boxname, callback=None, force=False):  # returns cached apidata at once, otherwise probes in background
+		apiurl = self.getapiurl(boxname)
+		if not apiurl:
+			if callback:
+				callback(boxname, None)
+			return None
+		cached = self.getcached(apiurl)
+		if cached is not None and not force:
+			if callback:
+				callback(boxname, cached[1])
+			return cached[1]
+		if callback:
+			self.callbacks.setdefault(apiurl, []).append((boxname, callback))
+		if apiurl not in self.pending:
+			self.pending.add(apiurl)
+			callInThread(self.getAPIdata, apiurl)
+
+	def probeall(self, callback=None):  # probes all discovered peers concurrently
+		for streamurl in getPeerStreamingBoxes() or []:
+			boxname = streamurl[streamurl.find("//") + 2:].split(":")[0].split(".")[0]
+			self.probe(boxname, callback)
+
+	def getcached(self, apiurl):
+		cached = self.cache.get(apiurl)
+		if cached and time() - cached[0] < (self.ttl if cached[1] else self.negttl):
+			return cached
+		return None
+
+	def getstatus(self, boxname):  # 'online', 'offline' or None (=unknown yet), never triggers a probe
+		if boxname == BoxInfo.getItem("BoxName"):
+			return "online"
+		apiurl = self.getapiurl(boxname)
+		if not apiurl:
+			return "offline"
+		cached = self.getcached(apiurl)
+		if cached is None:
+			return None
+		return "online" if cached[1] else "offline"
+
+	def getAPIdata(self, apiurl):
+		from requests import exceptions
+		from .Buildstatus import SCHEDULER, PREFETCH
+		apidata = None
+		try:
+			response = SCHEDULER.get(apiurl, PREFETCH, timeout=(1.5, 3))
+			response.raise_for_status()
+			apidata = loads(response.content)
+			apidata = apidata if isinstance(apidata, dict) and apidata.get("info") else None
+		except exceptions.RequestException as error:
+			print("[%s] ERROR in module 'getAPIdata': %s" % (MODULE_NAME, str(error)))
+		except ValueError as error:
+			print("[%s] ERROR in module 'getAPIdata': invalid json data from peer. %s" % (MODULE_NAME, str(error)))
+		finally:  # the apiurl must never stay pending, otherwise the peer is not probed again
+			callFromThread(self.probeCallback, apiurl, apidata)
+
+	def probeCallback(self, apiurl, apidata):  # runs in main thread
+		self.cache[apiurl] = (time(), apidata)
+		self.pending.discard(apiurl)
+		for boxname, callback in self.callbacks.pop(apiurl, []):
+			callback(boxname, apidata)
+
+	def cancel(self, callback):  # forget pending callbacks e.g. of closed screens
+		for apiurl in list(self.callbacks):
+			self.callbacks[apiurl] = [item for item in self.callbacks[apiurl] if item[1] != callback]
+
+
+PP = PeerProbe()
 
 
 class Carousel():
@@ -203,21 +385,22 @@ class ATVfavorites(Screen):
 
 	def createMenulist(self):
 		boxlist = []
-		usedarchs = []
+		usedarchs = dict()  # {architecture: [favorites]}
 		baselist = []
 		piclist = []
 		menulist = []
 		if FAVLIST:
 			self["menu"].style = "default"
 			for favorite in FAVLIST:
-				if favorite[1] not in usedarchs:
-					usedarchs.append(favorite[1])
-			for currarch in usedarchs:
-				currplat = [plat for plat in BS.platlist if currarch.upper() in plat][0]
+				usedarchs.setdefault(favorite[1], []).append(favorite)
+			for currarch, favorites in usedarchs.items():
+				currplat = BS.getplatform(currarch)
+				if not currplat:
+					continue
 				BS.getbuildinfos(currplat)
 				if BS.htmldict:
-					for box in [item for item in FAVLIST if item[1] in set([item[1]])]:
-						if box[1] in currarch and box[0] in BS.htmldict["boxinfo"]:
+					for box in favorites:
+						if box[0] in BS.htmldict["boxinfo"]:
 							boxlist.append((box[0], currarch))
 							bd = BS.htmldict["boxinfo"][box[0]]
 							palette = {"Building": 0x00B028, "Failed": 0xFF0400, "Complete": 0xFFFFFF, "Waiting": 0xFFAE00}
@@ -228,57 +411,60 @@ class ATVfavorites(Screen):
 								self.platdict[currplat]["cycletime"] = BS.strf_delta(cycletime)
 								self.platdict[currplat]["boxcounter"] = "%s" % counter
 								self.platdict[currplat]["boxfailed"] = "%s" % failed
+								self.platdict[currplat]["staleinfo"] = staleInfo()
 							nextbuild = "%sh" % BS.strf_delta(nextbuild) if nextbuild else ""
 							buildtime = bd["BuildTime"].strip()
 							buildtime = "%sh" % buildtime if buildtime else ""
 							textlist = [box[0], box[1], bd["BuildStatus"], nextbuild, "%s" % boxesahead, bd["StartBuild"], bd["EndBuild"], buildtime, color]
 							baselist.append(textlist)
-							picfile = join(TMPPATH, "%s.png" % box[0])
-							if exists(picfile):
-								pixmap = LoadPixmap(cached=True, path=picfile)
+							picture = getPicture(box[0], "list")
+							if picture:
+								pixmap = LoadPixmap(cached=True, path=picture)
 							else:
 								pixmap = None
 								piclist.append(box[0])
-							menulist.append(tuple(textlist + [pixmap]))
+							menulist.append(self.makeEntry(textlist, pixmap))
 							self["menu"].updateList(menulist)
 			self.baselist = baselist
 			self.boxlist = boxlist
 			for picname in piclist:
 				callInThread(self.imageDownload, picname)
+			PP.probeall(self.peerCallback)  # cached results are shown at once, all others are filled in as they arrive
 		else:
 			self["menu"].style = "emptylist"
 			self["menu"].updateList([(_("No favorites (box, platform) set yet."), _("Please select favorite(s) in the image lists."))])
 		self["menu"].setIndex(self.currindex)
 
-	def imageDownload(self, boxname):
-		try:
-			response = get(("%s%s.png" % (PICURL, boxname)).encode(), timeout=(3.05, 6))
-			response.raise_for_status()
-		except exceptions.RequestException as error:
-			print("[%s] ERROR in module 'imageDownload': %s" % (MODULE_NAME, str(error)))
-		else:
-			with open(join(TMPPATH, "%s.png" % boxname), "wb") as f:
-				f.write(response.content)
-		self.downloadCallback()
+	def imageDownload(self, boxname):  # runs in thread, the list is only updated in the main thread
+		makePicture(boxname)
+		callFromThread(self.downloadCallback)
 
 	def downloadCallback(self):
 		menulist = []
 		for textlist in self.baselist:
-			menulist.append(tuple(textlist + [LoadPixmap(cached=True, path=join(TMPPATH, "%s.png" % textlist[0]))]))
+			picture = getPicture(textlist[0], "list")
+			menulist.append(self.makeEntry(textlist, LoadPixmap(cached=True, path=picture) if picture else None))
 		self["menu"].updateList(menulist)
 
+	def peerCallback(self, boxname, apidata):
+		if boxname in [textlist[0] for textlist in self.baselist]:
+			self.downloadCallback()
+
+	def makeEntry(self, textlist, pixmap):  # architecture line also shows online/offline state of the favorite
+		status = PP.getstatus(textlist[0])
+		archinfo = "%s (%s)" % (textlist[1], _(status)) if status else textlist[1]
+		return tuple([textlist[0], archinfo] + textlist[2:] + [pixmap])
+
 	def refreshstatus(self):
 		if FAVLIST:
 			self.currindex = self["menu"].getSelectedIndex()
 			currplat = BS.getplatform(self.boxlist[self.currindex][1])
 			platdict = self.platdict[currplat]
-			self["platinfo"].setText("%s: %s, %s: %sh, %s %s, %s: %s" % (_("platform"), currplat, _("last build cycle"), platdict["cycletime"], platdict["boxcounter"], _("boxes"), _("failed"), platdict["boxfailed"]))
+			self["platinfo"].setText("%s: %s, %s: %sh, %s %s, %s: %s%s" % (_("platform"), currplat, _("last build cycle"), platdict["cycletime"], platdict["boxcounter"], _("boxes"), _("failed"), platdict["boxfailed"], platdict["staleinfo"]))
 
 	def msgboxReturn(self, answer):
 		if answer is True:
-			FAVLIST.remove(self.foundFavs[0])
-			config.plugins.OpenATVstatus.favboxes.value = ";".join("(%s)" % ",".join(item) for item in FAVLIST) if FAVLIST else ""
-			config.plugins.OpenATVstatus.favboxes.save()
+			removeFavorite(self.foundFavs[0])
 			self.createMenulist()
 			self.session.open(MessageBox, text=_("Box '%s-%s' was sucessfully removed from favorites!") % self.boxlist[self.currindex], type=MessageBox.TYPE_INFO, timeout=2, close_on_any_key=True)
 
@@ -288,7 +474,7 @@ class ATVfavorites(Screen):
 			self.session.open(ATVboxdetails, currbox)
 
 	def keyRed(self):
-		self.foundFavs = [item for item in FAVLIST if item == self.boxlist[self.currindex]]
+		self.foundFavs = [self.boxlist[self.currindex]] if self.boxlist[self.currindex] in FAVSET else []
 		if self.foundFavs:
 			self.session.openWithCallback(self.msgboxReturn, MessageBox, _("Do you really want to remove Box '%s-%s' from favorites?") % self.boxlist[self.currindex], MessageBox.TYPE_YESNO, default=False)
 
@@ -326,6 +512,7 @@ class ATVfavorites(Screen):
 
 	def exit(self):
 		BS.stop()
+		PP.cancel(self.peerCallback)
 		self.close()
 
 	def openConfig(self):
@@ -341,6 +528,11 @@ class ATVimageslist(Screen):
 		Screen.__init__(self, session, self.skin)
 		self.setTitle(_("Images list"))
 		self.boxlist = []
+		self.boxpos = dict()  # {boxname: index in boxlist}
+		self.shownrecords = dict()  # {boxname: record} as currently shown, unchanged records are reused by Buildstatus
+		self.shownarch = None
+		self.streamed = []  # (boxname, record) received so far while the page is loading
+		self.loading = False  # True until the page of 'currarch' is complete, BS.htmldict still belongs to the previous page
 		self.platidx = BS.archlist.index(self.currarch)
 		self.currindex = 0
 		self.favindex = 0
@@ -383,58 +575,99 @@ class ATVimageslist(Screen):
 													}, -1)
 		self.CS = Carousel(delay=int(config.plugins.OpenATVstatus.animate.value))
 		self.CS.start(BS.platlist, self.platidx, self.CarouselCallback)
+		self.refreshTimer = eTimer()
+		self.refreshTimer.callback.append(self.loadplatlist)
 		self.onLayoutFinish.append(self.onLayoutFinished)
 
 	def onLayoutFinished(self):
 		self["menu"].setList([])
 		self.setPlatformStatic()
-		self.refreshplatlist()
+		self.refreshplatlist(0)
+
+	def refreshplatlist(self, delay=DEBOUNCE):  # rapid platform changes result in a single download only
+		BS.cancel()  # a running download of the previous platform is no longer needed
+		self.refreshTimer.start(delay, True)
 
-	def refreshplatlist(self):
+	def loadplatlist(self):
 		self.currarch = BS.archlist[self.platidx]
-		BS.getbuildinfos(BS.platlist[self.platidx], self.makeimagelist)
+		self.streamed = []
+		self.loading = True
+		rowcallback = self.rowCallback if self.shownarch != self.currarch else None  # a shown platform is only redrawn when complete
+		BS.getbuildinfos(BS.platlist[self.platidx], self.makeimagelist, rowcallback)
+
+	def rowCallback(self, boxname, record):  # called in thread for every row as soon as it is received
+		self.streamed.append((boxname, record))
+		if len(self.streamed) % STREAMBATCH == 0:
+			callFromThread(self.showRows, self.streamed[:], self.currarch)
+
+	def showRows(self, rows, arch):  # shows the first rows while the rest of the page is still loading
+		if arch != self.currarch or self.shownarch == arch:  # platform was changed or page is already complete
+			return
+		self.boxlist = [(boxname, arch) for boxname, record in rows]
+		self.boxpos = {box[0]: idx for idx, box in enumerate(self.boxlist)}
+		self["menu"].updateList([self.makeEntry(boxname, record) for boxname, record in rows])
 
 	def makeimagelist(self):
+		self.loading = False
 		self["prev_label"].setText(_("previous"))
 		self["curr_label"].setText(_("current platform"))
 		self["next_label"].setText(_("next"))
 		menulist = []
 		boxlist = []
 		if BS.htmldict:
-			for boxname in BS.htmldict["boxinfo"]:
-				boxlist.append((boxname, self.currarch))
-				bd = BS.htmldict["boxinfo"][boxname]
-				palette = {"Building": 0x00B028, "Failed": 0xFF0400, "Complete": 0xB0B0B0, "Waiting": 0xFFAE00}
-				color = 0xFDFf00 if [item for item in FAVLIST if item == (boxname, self.currarch)] else palette.get(bd["BuildStatus"], 0xB0B0B0)
-				buildtime = bd["BuildTime"].strip()
-				buildtime = "%sh" % buildtime if buildtime else ""
-				menulist.append(tuple([boxname, bd["BuildStatus"], bd["StartBuild"], bd["StartFeedSync"], bd["EndBuild"], bd["SyncTime"], buildtime, color]))
-			self["menu"].updateList(menulist)
-			self.boxlist = boxlist
+			boxinfo = BS.htmldict["boxinfo"]
+			if self.shownarch == self.currarch and list(self.shownrecords) == list(boxinfo):  # same rows as shown: only redraw the changed ones
+				for idx, (boxname, bd) in enumerate(boxinfo.items()):
+					if bd is not self.shownrecords[boxname]:
+						self["menu"].modifyEntry(idx, self.makeEntry(boxname, bd))
+			else:
+				for boxname, bd in boxinfo.items():
+					boxlist.append((boxname, self.currarch))
+					menulist.append(self.makeEntry(boxname, bd))
+				self["menu"].updateList(menulist)
+				self.boxlist = boxlist
+				self.boxpos = {box[0]: idx for idx, box in enumerate(boxlist)}
+			self.shownrecords = dict(boxinfo)
+			self.shownarch = self.currarch
 		if self.currfav:
-			foundbox = [item for item in boxlist if item[0] == self.currfav]
-			if foundbox:
-				self["menu"].setIndex(self.boxlist.index(foundbox[0]))
+			favname = self.currfav[0] if isinstance(self.currfav, tuple) else self.currfav
+			if favname in self.boxpos:
+				self["menu"].setIndex(self.boxpos[favname])
 			self.currfav = None
 		self.refreshstatus()
 
+	def makeEntry(self, boxname, bd):
+		palette = {"Building": 0x00B028, "Failed": 0xFF0400, "Complete": 0xB0B0B0, "Waiting": 0xFFAE00}
+		color = 0xFDFf00 if (boxname, self.currarch) in FAVSET else palette.get(bd["BuildStatus"], 0xB0B0B0)
+		buildtime = bd["BuildTime"].strip()
+		buildtime = "%sh" % buildtime if buildtime else ""
+		return tuple([boxname, bd["BuildStatus"], bd["StartBuild"], bd["StartFeedSync"], bd["EndBuild"], bd["SyncTime"], buildtime, color])
+
 	def refreshstatus(self):
 		self.currindex = self["menu"].getSelectedIndex()
-		if [item for item in FAVLIST if item == self.boxlist[self.currindex]]:
+		if self.boxlist[self.currindex] in FAVSET:
 			self["key_red"].setText(_("remove box from favorites"))
 		else:
 			self["key_red"].setText(_("add box to favorites"))
+		if self.loading:  # evaluations are only possible with the complete page
+			self["boxinfo"].setText(_("loading platform data..."))
+			self["platinfo"].setText("")
+			return
 		nextbuild, boxesahead, cycletime, counter, failed = BS.evaluate(self.boxlist[self.currindex][0])
-		if nextbuild:
+		forecast = BS.forecast(self.boxlist[self.currindex][0])
+		if forecast and forecast["position"]:
+			self["boxinfo"].setText(_("next build ends in %sh (%sh - %sh), still %s boxes before") % (BS.strf_delta(timedelta(seconds=forecast["eta"])), BS.strf_delta(timedelta(seconds=forecast["etalow"])), BS.strf_delta(timedelta(seconds=forecast["etahigh"])), forecast["position"]))
+		elif nextbuild:
 			self["boxinfo"].setText(_("next build ends in %sh, still %s boxes before") % (BS.strf_delta(nextbuild), boxesahead))
 		else:
 			self["boxinfo"].setText(_("image is under construction or failed, duration is unclear..."))
 		if cycletime:
-			self["platinfo"].setText("%s: %sh, %s %s, %s: %s" % (_("last build cycle"), BS.strf_delta(cycletime), counter, _("boxes"), _("failed"), failed))
+			self["platinfo"].setText("%s: %sh, %s %s, %s: %s%s" % (_("last build cycle"), BS.strf_delta(cycletime), counter, _("boxes"), _("failed"), failed, staleInfo()))
 		else:
 			self["boxinfo"].setText(_("no box found in this platform!"))
 			self["platinfo"].setText(_("nothing to do - no build cycle"))
 			self["menu"].setList([])
+			self.shownrecords = dict()
 
 	def nextPlatform(self):
 		self.platidx = (self.platidx + 1) % len(BS.platlist)
@@ -469,40 +702,48 @@ class ATVimageslist(Screen):
 
 	def msgboxReturn(self, answer):
 		if answer is True:
-			FAVLIST.remove(self.foundFavs[0])
-			config.plugins.OpenATVstatus.favboxes.value = ";".join("(%s)" % ",".join(item) for item in FAVLIST) if FAVLIST else ""
-			config.plugins.OpenATVstatus.favboxes.save()
+			removeFavorite(self.foundFavs[0])
 			self.session.open(MessageBox, text=_("Box '%s-%s' was sucessfully removed from favorites!") % self.boxlist[self.currindex], type=MessageBox.TYPE_INFO, timeout=2, close_on_any_key=True)
+			self.shownrecords[self.foundFavs[0][0]] = None  # forces redraw of this row
 			self.refreshplatlist()
 
 	def keyRed(self):
-		self.foundFavs = [item for item in FAVLIST if item == self.boxlist[self.currindex]]
+		self.foundFavs = [self.boxlist[self.currindex]] if self.boxlist[self.currindex] in FAVSET else []
 		if self.foundFavs:
 			self.session.openWithCallback(self.msgboxReturn, MessageBox, _("Do you really want to remove Box '%s-%s' from favorites?") % self.boxlist[self.currindex], MessageBox.TYPE_YESNO, default=False)
 		else:
-			FAVLIST.append(self.boxlist[self.currindex])
-			config.plugins.OpenATVstatus.favboxes.value = ";".join("(%s)" % ",".join(item) for item in FAVLIST) if FAVLIST else ""
-			config.plugins.OpenATVstatus.favboxes.save()
+			addFavorite(self.boxlist[self.currindex])
 			self.session.open(MessageBox, text=_("Box '%s-%s' was sucessfully added to favorites!") % self.boxlist[self.currindex], type=MessageBox.TYPE_INFO, timeout=2, close_on_any_key=True)
+			self.shownrecords[self.boxlist[self.currindex][0]] = None  # forces redraw of this row
 			self.refreshplatlist()
 
 	def keyGreen(self):
 		if self.boxlist:
-			findbuildbox = (BS.findbuildbox(), self.currarch)
-			if findbuildbox[0]:
-				self["menu"].setIndex(self.boxlist.index(findbuildbox))
+			if self.loading:  # BS.htmldict belongs to the previous page: search the rows received so far
+				findbuildbox = (next((boxname for boxname, record in self.streamed[:] if "Building" in record["BuildStatus"]), None), self.currarch)
+			else:
+				findbuildbox = (BS.findbuildbox(), self.currarch)
+			if findbuildbox[0] in self.boxpos:
+				self["menu"].setIndex(self.boxpos[findbuildbox[0]])
 				self.refreshstatus()
+			elif self.loading:  # the box may be in the rows still to come
+				return
 			else:
 				self.session.open(MessageBox, text=_("At the moment no image is built on the platform '%s'!") % BS.getplatform(self.currarch), type=MessageBox.TYPE_INFO, timeout=5, close_on_any_key=True)
 
 	def keyYellow(self):
 		if self.boxlist and FAVLIST:
-			self.favindex = (self.favindex + 1) % len(FAVLIST)
-			self.currfav = FAVLIST[self.favindex]
-			if self.currfav in self.boxlist:
-				self["menu"].setIndex(self.boxlist.index(self.currfav))
+			for idx in range(len(FAVLIST)):  # skip favorites which are known to be no longer built on their platform
+				self.favindex = (self.favindex + 1) % len(FAVLIST)
+				self.currfav = FAVLIST[self.favindex]
+				currplat = BS.getplatform(self.currfav[1])
+				if currplat and (currplat not in BS.index.platforms or currplat in BS.index.lookup(self.currfav[0])):
+					break
+			if self.currfav[1] == self.currarch and self.currfav[0] in self.boxpos:
+				self["menu"].setIndex(self.boxpos[self.currfav[0]])
+				self.currfav = None
 				self.refreshstatus()
-			else:
+			elif self.currfav[1] in BS.archlist:
 				self.platidx = BS.archlist.index(self.currfav[1])
 				self.CS.moveToIndex(self.platidx)
 				self.setPlatformStatic()
@@ -533,6 +774,7 @@ class ATVimageslist(Screen):
 		self.refreshstatus()
 
 	def exit(self):
+		self.refreshTimer.stop()
 		BS.stop()
 		self.CS.stop()
 		self.close()
@@ -564,58 +806,46 @@ class ATVboxdetails(Screen):
 
 	def onLayoutFinished(self):
 		self["picture"].hide()
-		self.picfile = join(TMPPATH, "%s.png" % self.box[0])
-		if exists(self.picfile):
+		self.picfile = getPicture(self.box[0], "details")
+		if self.picfile:
 			self.downloadCallback()
 		else:
 			callInThread(self.imageDownload, self.box[0])
-		status = "offline"
 		details = ""
 		if self.box[0] == BoxInfo.getItem("BoxName"):
-			status = "online"
 			details += "%s:\t%s\n" % (_("Model"), BoxInfo.getItem("displaymodel"))
 			details += "%s:\t%s\n" % (_("Brand"), BoxInfo.getItem("displaybrand"))
 			details += "%s:\t%s\n" % (_("Image"), BoxInfo.getItem("displaydistro"))
 			details += "%s:\t%s.%s\n" % (_("Version"), BoxInfo.getItem("imageversion"), BoxInfo.getItem("imgrevision"))
 			details += "%s:\t%s\n" % (_("Chipset"), BoxInfo.getItem("socfamily"))
+			self["status"].setText("online")
 			self["details"].setText(details)
 		else:
-			streamurls = getPeerStreamingBoxes()
-			if streamurls:
-				streamurl = [x for x in streamurls if self.box[0] in x]  # example streamurls: ['http://gbue4k.local:8001', 'http://sf8008.local:8001']
-				bd = self.getAPIdata("%s:80/api/about" % streamurl[0][:streamurl[0].rfind(":")]) if streamurl else None
-				if bd and bd["info"]:
-					status = "online"
-					details += "%s:\t%s\n" % (_("Model"), bd.get("info", {}).get("model", ""))
-					details += "%s:\t%s\n" % (_("Brand"), bd.get("info", {}).get("brand", ""))
-					details += "%s:\t%s\n" % (_("Image"), bd.get("info", {}).get("friendlyimagedistro", ""))
-					details += "%s:\t%s\n" % (_("Version"), bd.get("info", {}).get("imagever", ""))
-					details += "%s:\t%s\n" % (_("Chipset"), "%sh" % bd.get("info", {}).get("chipset", ""))
-					self["status"].setText("online")
-				else:
-					details += "%s:\t%s\n" % (_("Model"), self.box[0])
-					details += "\n%s" % (_("Box is OFFLINE! No current details available"))
+			self["status"].setText("")
+			self["details"].setText("%s:\t%s\n" % (_("Model"), self.box[0]))
+			PP.probe(self.box[0], self.probeCallback)  # answers at once from cache, otherwise as soon as the box responds
+
+	def probeCallback(self, boxname, bd):
+		details = ""
+		if bd and bd["info"]:
+			status = "online"
+			details += "%s:\t%s\n" % (_("Model"), bd.get("info", {}).get("model", ""))
+			details += "%s:\t%s\n" % (_("Brand"), bd.get("info", {}).get("brand", ""))
+			details += "%s:\t%s\n" % (_("Image"), bd.get("info", {}).get("friendlyimagedistro", ""))
+			details += "%s:\t%s\n" % (_("Version"), bd.get("info", {}).get("imagever", ""))
+			details += "%s:\t%s\n" % (_("Chipset"), "%sh" % bd.get("info", {}).get("chipset", ""))
+		else:
+			status = "offline"
+			details += "%s:\t%s\n" % (_("Model"), self.box[0])
+			details += "\n%s" % (_("Box is OFFLINE! No current details available"))
 		self["status"].setText(status)
 		self["details"].setText(details)
 
-	def getAPIdata(self, apiurl):
-		try:
-			response = get(apiurl, timeout=(3.05, 6))
-			response.raise_for_status()
-			return loads(response.content)
-		except exceptions.RequestException as error:
-			print("[OpenATVstatus] ERROR in module 'getAPIdata': %s" % str(error))
-
-	def imageDownload(self, boxname):
-		try:
-			response = get(("%s%s.png" % (PICURL, boxname)).encode(), timeout=(3.05, 6))
-			response.raise_for_status()
-		except exceptions.RequestException as error:
-			print("[%s] ERROR in module 'imageDownload': %s" % (MODULE_NAME, str(error)))
-		else:
-			with open(join(TMPPATH, "%s.png" % boxname), "wb") as f:
-				f.write(response.content)
-		self.downloadCallback()
+	def imageDownload(self, boxname):  # runs in thread, the picture is only shown in the main thread
+		makePicture(boxname)
+		self.picfile = getPicture(boxname, "details")
+		if self.picfile:
+			callFromThread(self.downloadCallback)
 
 	def downloadCallback(self):
 		self["picture"].instance.setPixmapScaleFlags(BT_SCALE | BT_KEEP_ASPECT_RATIO | BT_HALIGN_CENTER | BT_VALIGN_CENTER)
@@ -623,6 +853,7 @@ class ATVboxdetails(Screen):
 		self["picture"].show()
 
 	def exit(self):
+		PP.cancel(self.probeCallback)
 		self.close()
 
 
@@ -644,10 +875,17 @@ class ATVconfig(ConfigListScreen, Screen):
 		ConfigListScreen.__init__(self, self.clist)
 		self.clist.append(getConfigListEntry(_("Preferred box architecture for images list:"), config.plugins.OpenATVstatus.favarch, _("Specify which box architecture should be preferred when images list will be called. If option 'current' is selected, the architecture of the selected box is taken.")))
 		self.clist.append(getConfigListEntry(_("Animation for change of platform:"), config.plugins.OpenATVstatus.animate, _("Sets the animation speed for the carousel function when changing platforms.")))
+		self.clist.append(getConfigListEntry(_("Serve build status to other receivers (hub):"), config.plugins.OpenATVstatus.hubserver, _("This box polls the build servers and serves the data to all other receivers in the LAN. Takes effect after restart of the GUI.")))
+		self.clist.append(getConfigListEntry(_("Use hub as data source (URL):"), config.plugins.OpenATVstatus.huburl, _("Receivers read the build status from this hub, e.g. 'http://192.168.0.10:8780'. The build servers are only accessed if the hub is not available.")))
+		self.clist.append(getConfigListEntry(_("Mirrors of the build servers (URLs):"), config.plugins.OpenATVstatus.mirrors, _("Comma separated list of mirrors serving the same data as the build servers. Slow requests are repeated on the fastest mirror and the first answer is taken.")))
 		self["config"].setList(self.clist)
 
 	def keyGreen(self):
 		config.plugins.OpenATVstatus.save()
+		if BS:
+			hub = getHuburl()
+			BS.hub = hub.rstrip("/") if hub else None
+			BS.mirrors = getMirrors()
 		self.close()
 
 	def keyCancel(self):
@@ -657,12 +895,21 @@ class ATVconfig(ConfigListScreen, Screen):
 
 
 def main(session, **kwargs):
+		initBuildstatus()
 		session.open(ATVfavorites)
 
 
-def autostart(reason, **kwargs):
-	pass
+def autostart(reason, **kwargs):  # reason 0 = enigma2 starts, 1 = enigma2 shuts down
+	global HUB
+	if reason == 0 and HUB is None and config.plugins.OpenATVstatus.hubserver.value:
+		from .Buildhub import Buildhub
+		HUB = Buildhub(mirrors=getMirrors())
+		HUB.start()
+	elif reason == 1 and HUB:
+		HUB.stop()
+		HUB = None
 
 
 def Plugins(**kwargs):
-	return PluginDescriptor(name="OpenATV Status", icon="plugin.png", description=_("Current overview of the OpenATV images building servers"), where=PluginDescriptor.WHERE_PLUGINMENU, fnc=main)
+	return [PluginDescriptor(name="OpenATV Status", icon="plugin.png", description=_("Current overview of the OpenATV images building servers"), where=PluginDescriptor.WHERE_PLUGINMENU, fnc=main),
+			PluginDescriptor(where=PluginDescriptor.WHERE_AUTOSTART, fnc=autostart)]  # unlike WHERE_SESSIONSTART also called at shutdown
@@ -0,0 +1,19 @@
+# headless stand-in of enigma2's Components.ActionMap, see benchmark.py
+ACTIONS = ("ok", "back", "cancel", "red", "green", "yellow", "blue", "up", "down", "left", "right", "nextBouquet", "prevBouquet", "nextMarker", "prevMarker", "menu", "info")
+
+
+class ActionMap():
+	def __init__(self, contexts=None, actions=None, prio=0):
+		self.contexts = contexts or []
+		self.actions = dict(actions or {})
+		self.prio = prio  # lower values are asked first
+		self.enabled = True
+
+	def execute(self, action):  # False if this map has no such action
+		if not self.enabled or action not in self.actions:
+			return False
+		self.actions[action]()
+		return True
+
+	def setEnabled(self, enabled):
+		self.enabled = enabled
@@ -0,0 +1,32 @@
+# headless stand-in of enigma2's Components.ConfigList, see benchmark.py
+from Components.ActionMap import ActionMap
+from Components.Sources.List import count
+
+
+class ConfigList():
+	def __init__(self, list):
+		self.list = list
+		self.index = 0
+
+	def setList(self, list):
+		count("setList")
+		self.list = list
+		self.index = min(self.index, max(0, len(list) - 1))
+
+	def getCurrent(self):
+		return self.list[self.index] if self.list else None
+
+	def handleKey(self, key):
+		current = self.getCurrent()
+		if key == "up":
+			self.index = max(0, self.index - 1)
+		elif key == "down":
+			self.index = min(len(self.list) - 1, self.index + 1)
+		elif current:
+			current[1].handleKey(key)
+
+
+class ConfigListScreen():
+	def __init__(self, list, session=None, on_change=None):
+		self["config"] = ConfigList(list)
+		self["config_actions"] = ActionMap(["SetupActions"], {key: (lambda key=key: self["config"].handleKey(key)) for key in ("up", "down", "left", "right")}, -2)
@@ -0,0 +1,19 @@
+# headless stand-in of enigma2's Components.Label, see benchmark.py
+
+
+class Label():
+	def __init__(self, text=""):
+		self.text = text
+		self.visible = True
+
+	def setText(self, text):
+		self.text = text
+
+	def getText(self):
+		return self.text
+
+	def show(self):
+		self.visible = True
+
+	def hide(self):
+		self.visible = False
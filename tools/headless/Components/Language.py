@@ -0,0 +1,12 @@
+# headless stand-in of enigma2's Components.Language, see benchmark.py
+
+
+class Language():
+	def __init__(self):
+		self.callbacks = []
+
+	def addCallback(self, callback):
+		self.callbacks.append(callback)
+
+
+language = Language()
@@ -0,0 +1,26 @@
+# headless stand-in of enigma2's Components.Pixmap, see benchmark.py
+from Tools.LoadPixmap import LoadPixmap
+
+
+class ePixmap():
+	def __init__(self):
+		self.flags = 0
+		self.pixmap = None  # decoded picture, holds the same memory as on the receiver
+
+	def setPixmapScaleFlags(self, flags):
+		self.flags = flags
+
+	def setPixmapFromFile(self, path):
+		self.pixmap = LoadPixmap(path)
+
+
+class Pixmap():
+	def __init__(self):
+		self.instance = ePixmap()
+		self.visible = True
+
+	def show(self):
+		self.visible = True
+
+	def hide(self):
+		self.visible = False
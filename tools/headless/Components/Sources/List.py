@@ -0,0 +1,62 @@
+# headless stand-in of enigma2's Components.Sources.List, see benchmark.py
+from collections import Counter
+from threading import current_thread, main_thread
+
+COUNTERS = Counter()  # calls of setList, updateList and modifyEntry of all lists, 'offthread' counts calls outside the main thread
+
+
+def count(name):
+	COUNTERS[name] += 1
+	if current_thread() is not main_thread():  # on the receiver the GUI must only be changed from the main thread
+		COUNTERS["offthread"] += 1
+
+
+class List():
+	def __init__(self, list=None, enableWrapAround=False, item_height=25, fonts=None):
+		self.list = list or []
+		self.index = 0
+		self.style = "default"
+
+	def setList(self, list):
+		count("setList")
+		self.list = list
+		self.index = min(self.index, max(0, len(list) - 1))
+
+	def updateList(self, list):
+		count("updateList")
+		self.list = list
+		self.index = min(self.index, max(0, len(list) - 1))
+
+	def modifyEntry(self, index, data):
+		count("modifyEntry")
+		self.list[index] = data
+
+	def getCurrent(self):
+		return self.list[self.index] if self.list else None
+
+	def getSelectedIndex(self):
+		return self.index
+
+	def setIndex(self, index):
+		self.index = max(0, min(index, len(self.list) - 1))
+
+	def up(self):
+		self.setIndex(self.index - 1)
+
+	def down(self):
+		self.setIndex(self.index + 1)
+
+	def pageUp(self):
+		self.setIndex(self.index - 10)
+
+	def pageDown(self):
+		self.setIndex(self.index + 10)
+
+	def top(self):
+		self.setIndex(0)
+
+	def bottom(self):
+		self.setIndex(len(self.list) - 1)
+
+	def count(self):
+		return len(self.list)
@@ -0,0 +1,10 @@
+# headless stand-in of enigma2's Components.SystemInfo, see benchmark.py
+ITEMS = {"BoxName": "headless", "displaymodel": "Headless", "displaybrand": "Linux", "displaydistro": "openATV", "imageversion": "7.3", "imgrevision": "0", "socfamily": "none"}
+
+
+class BoxInformation():
+	def getItem(self, name, default=None):
+		return ITEMS.get(name, default)
+
+
+BoxInfo = BoxInformation()
@@ -0,0 +1,115 @@
+# headless stand-in of enigma2's Components.config, see benchmark.py: settings are kept in memory only
+SETTINGS = dict()  # {'config.plugins.name.setting': saved value as string}, may be preset before the plugin is imported
+
+
+class ConfigElement():
+	def __init__(self, default):
+		self.default = default
+		self.value = default
+		self.saved_value = None  # saved string, None = default
+		self.name = ""
+
+	def setname(self, name):
+		self.name = name
+		self.load()
+
+	def tostring(self, value):
+		return str(value)
+
+	def fromstring(self, value):
+		return value
+
+	def load(self):
+		self.saved_value = SETTINGS.get(self.name)
+		self.value = self.default if self.saved_value is None else self.fromstring(self.saved_value)
+
+	def save(self):
+		if self.value == self.default:
+			SETTINGS.pop(self.name, None)
+			self.saved_value = None
+		else:
+			self.saved_value = self.tostring(self.value)
+			SETTINGS[self.name] = self.saved_value
+
+	def cancel(self):
+		self.load()
+
+	def handleKey(self, key):
+		pass
+
+
+class ConfigSelection(ConfigElement):
+	def __init__(self, choices, default=None):
+		self.setChoices(choices, default)
+		ConfigElement.__init__(self, self.default)
+
+	def setChoices(self, choices, default=None):
+		self.choices = [choice if isinstance(choice, tuple) else (choice, choice) for choice in choices]
+		keys = [choice[0] for choice in self.choices]
+		self.default = default if default in keys else (keys[0] if keys else None)
+		if getattr(self, "value", None) not in keys:
+			self.value = self.default
+
+	def load(self):  # unknown saved values fall back to the default, like on the receiver
+		ConfigElement.load(self)
+		if self.value not in [choice[0] for choice in self.choices]:
+			self.value = self.default
+
+	def handleKey(self, key):  # 'left'' and 'right' cycle through the choices
+		keys = [choice[0] for choice in self.choices]
+		if keys and key in ("left", "right"):
+			index = keys.index(self.value) if self.value in keys else 0
+			self.value = keys[(index + (1 if key == "right" else -1)) % len(keys)]
+
+
+class ConfigText(ConfigElement):
+	def __init__(self, default="", fixed_size=True, visible_width=False):
+		ConfigElement.__init__(self, default)
+
+
+class ConfigYesNo(ConfigElement):
+	def __init__(self, default=False):
+		ConfigElement.__init__(self, default)
+
+	def tostring(self, value):
+		return "true" if value else "false"
+
+	def fromstring(self, value):
+		return value == "true"
+
+	def handleKey(self, key):
+		if key in ("left", "right"):
+			self.value = not self.value
+
+
+class ConfigSubsection():
+	def __init__(self):
+		object.__setattr__(self, "name", "")
+		object.__setattr__(self, "content", dict())  # {name: element or subsection}
+
+	def __setattr__(self, name, value):  # elements get their dotted name and saved value when assigned
+		self.content[name] = value
+		object.__setattr__(self, name, value)
+		value.setname("%s.%s" % (self.name, name))
+
+	def setname(self, name):
+		object.__setattr__(self, "name", name)
+		for key, value in self.content.items():
+			value.setname("%s.%s" % (name, key))
+
+	def save(self):
+		for value in self.content.values():
+			value.save()
+
+	def load(self):
+		for value in self.content.values():
+			value.load()
+
+
+config = ConfigSubsection()
+config.setname("config")
+config.plugins = ConfigSubsection()
+
+
+def getConfigListEntry(*args):
+	return args
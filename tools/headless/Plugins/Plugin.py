@@ -0,0 +1,15 @@
+# headless stand-in of enigma2's Plugins.Plugin, see benchmark.py
+
+
+class PluginDescriptor():
+	WHERE_PLUGINMENU = 0
+	WHERE_EXTENSIONSMENU = 1
+	WHERE_SESSIONSTART = 2
+	WHERE_AUTOSTART = 3
+
+	def __init__(self, name="", description="", where=None, icon=None, fnc=None, **kwargs):
+		self.name = name
+		self.description = description
+		self.where = where if isinstance(where, list) else [where]
+		self.icon = icon
+		self.fnc = fnc
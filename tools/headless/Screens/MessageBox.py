@@ -0,0 +1,35 @@
+# headless stand-in of enigma2's Screens.MessageBox, see benchmark.py
+from enigma import eTimer
+from Components.ActionMap import ActionMap, ACTIONS
+from Components.Label import Label
+from Screens.Screen import Screen
+
+
+class MessageBox(Screen):
+	TYPE_YESNO = 0
+	TYPE_INFO = 1
+	TYPE_WARNING = 2
+	TYPE_ERROR = 3
+
+	def __init__(self, session, text="", type=TYPE_YESNO, timeout=-1, close_on_any_key=False, default=True, **kwargs):
+		Screen.__init__(self, session)
+		self.type = type
+		self["text"] = Label(text)
+		actions = {key: self.cancel for key in ACTIONS} if close_on_any_key else dict()
+		actions.update({"ok": self.ok, "cancel": self.cancel, "back": self.cancel})
+		self["actions"] = ActionMap(["MsgBoxActions"], actions, -1)
+		self.timer = eTimer()
+		if timeout > 0:
+			self.timer.callback.append(self.timeout)
+			self.timer.startLongTimer(timeout)
+
+	def ok(self):
+		self.timer.stop()
+		self.close(True if self.type == self.TYPE_YESNO else None)
+
+	def cancel(self):
+		self.timer.stop()
+		self.close(False)
+
+	def timeout(self):
+		self.close(False if self.type == self.TYPE_YESNO else None)
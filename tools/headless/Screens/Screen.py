@@ -0,0 +1,22 @@
+# headless stand-in of enigma2's Screens.Screen, see benchmark.py
+
+
+class Screen(dict):
+	def __init__(self, session, *args, **kwargs):
+		dict.__init__(self)
+		self.session = session
+		self.title = ""
+		self.onLayoutFinish = []
+		self.onClose = []
+
+	def __hash__(self):  # screens are compared by identity like on the receiver
+		return id(self)
+
+	def __eq__(self, other):
+		return self is other
+
+	def setTitle(self, title):
+		self.title = title
+
+	def close(self, *retval):
+		self.session.close(self, *retval)
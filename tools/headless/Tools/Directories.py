@@ -0,0 +1,15 @@
+# headless stand-in of enigma2's Tools.Directories, see benchmark.py
+from os.path import join
+from sys import modules
+
+SCOPE_PLUGINS = 1
+PLUGINROOT = "/usr/lib/enigma2/python/Plugins/"
+
+
+def resolveFilename(scope, base=""):  # plugins loaded by the benchmark are resolved to their source directory
+	if scope == SCOPE_PLUGINS:
+		package = modules.get("Plugins.%s" % base.strip("/").replace("/", "."))
+		if package:
+			return join(package.__path__[0], "")
+		return join(PLUGINROOT, base)
+	return base
@@ -0,0 +1,27 @@
+# headless stand-in of enigma2's Tools.LoadPixmap, see benchmark.py: pictures occupy the memory of their decoded pixels
+from struct import unpack
+
+CACHE = dict()  # {path: pixmap} of all pictures loaded with cached=True, as on the receiver never freed
+
+
+class PixmapData(bytearray):  # 32 bits per pixel like an enigma2 pixmap
+	def __init__(self, width, height):
+		bytearray.__init__(self, width * height * 4)
+		self.width = width
+		self.height = height
+
+
+def LoadPixmap(path, desktop=None, cached=False, width=0, height=0):
+	if cached and path in CACHE:
+		return CACHE[path]
+	try:
+		with open(path, "rb") as f:
+			header = f.read(24)
+	except OSError:
+		return None
+	if header[:8] != b"\x89PNG\r\n\x1a\n":
+		return None
+	pixmap = PixmapData(*unpack(">II", header[16:24]))  # size from the IHDR chunk
+	if cached:
+		CACHE[path] = pixmap
+	return pixmap
@@ -0,0 +1,354 @@
+#########################################################################################################
+#                                                                                                       #
+#  Headless benchmark of the OpenATVstatus screens: scripted key presses on Linux without a receiver    #
+#  Coded by Mr.Servo @ openATV (c) 2023                                                                 #
+#  Learn more about the tool by running it in the shell: "python benchmark.py -h"                       #
+#  -----------------------------------------------------------------------------------------------------#
+#  This plugin is licensed under the GNU version 3.0 <https://www.gnu.org/licenses/gpl-3.0.en.html>.    #
+#  This plugin is NOT free software. It is open source, you are allowed to modify it (if you keep       #
+#  the license), but it may not be commercially distributed. Advertise with this tool is not allowed.   #
+#  For other uses, permission from the authors is necessary.                                            #
+#                                                                                                       #
+#########################################################################################################
+
+# PYTHON IMPORTS
+from contextlib import redirect_stdout
+from getopt import getopt, GetoptError
+from glob import glob
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from importlib.util import module_from_spec, spec_from_file_location
+from io import StringIO
+from itertools import zip_longest
+from json import dumps, loads
+from os import makedirs
+from os.path import join, abspath, basename, dirname, isdir
+from re import findall, match
+from shutil import rmtree
+from struct import pack
+from sys import exit, argv, modules, path, stdout
+from tempfile import mkdtemp
+from threading import Thread
+from time import perf_counter
+from traceback import print_exc
+from zlib import compress, crc32
+import tempfile
+import tracemalloc
+
+# STAND-IN IMPORTS
+HEADLESSDIR = dirname(abspath(__file__))
+path.insert(0, HEADLESSDIR)  # the stand-ins take the place of enigma2
+from enigma import DESKTOP, MAINLOOP
+from Components.ActionMap import ActionMap, ACTIONS
+from Components.config import SETTINGS
+from Components.Sources.List import COUNTERS
+
+MODULE_NAME = __name__.split(".")[-1]
+PLUGINDIR = join(HEADLESSDIR, "..", "..", "src")
+PACKAGE = "Plugins.Extensions.OpenATVstatus"
+PICSIZE = (1000, 360)  # size of the generated box pictures, about the size of the pictures on github
+# {scenario: (screen, keys)}, keys are pressed one after another, 'key*n' presses a key n times
+SCENARIOS = {"favorites": ("favorites", "down*5,up*2,right,left,ok,back,blue,nextMarker,back,back"),
+			"imageslist": ("imageslist", "down*10,pagedown*3,nextMarker*3,prevMarker*3,green,yellow,back"),
+			"boxdetails": ("boxdetails", "back"),
+			"config": ("config", "right*2,down,right,down*3,red")}
+KEYNAMES = {"pagedown": "right", "pageup": "left"}  # aliases of the scenario keys
+
+
+class Session():  # stand-in of enigma2's session: a stack of screens, keys are sent to the topmost one
+	def __init__(self):
+		self.dialogs = []  # [(screen, callback)]
+
+	def open(self, screenclass, *args, **kwargs):
+		return self.openWithCallback(None, screenclass, *args, **kwargs)
+
+	def openWithCallback(self, callback, screenclass, *args, **kwargs):
+		screen = screenclass(self, *args, **kwargs)
+		self.dialogs.append((screen, callback))
+		for function in list(screen.onLayoutFinish):  # screens are shown at once, there is no skin to be applied
+			function()
+		return screen
+
+	def close(self, screen, *retval):
+		for idx, (dialog, callback) in enumerate(self.dialogs):
+			if dialog is screen:
+				del self.dialogs[idx]
+				for function in list(screen.onClose):
+					function()
+				if callback:
+					callback(*retval)
+				return
+
+	def current(self):
+		return self.dialogs[-1][0] if self.dialogs else None
+
+	def key(self, action):  # the action maps of the topmost screen are asked in order of their priority
+		screen = self.current()
+		if screen is None:
+			return False
+		for actionmap in sorted((value for value in screen.values() if isinstance(value, ActionMap)), key=lambda actionmap: actionmap.prio):
+			if actionmap.execute(action):
+				return True
+		return False
+
+
+def makepng(width, height):  # plain RGBA picture without any dependencies
+	def chunk(name, data):
+		return pack(">I", len(data)) + name + data + pack(">I", crc32(name + data) & 0xFFFFFFFF)
+	row = b"\x00" + b"\x40\x40\x40\xff" * width
+	return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)) + chunk(b"IDAT", compress(row * height, 9)) + chunk(b"IEND", b"")
+
+
+def makefixture(archs, boxes):  # {filename: content} of a build server with 'boxes' boxes per platform, a single box is under construction
+	files = dict()
+	statuses = ("Complete", "Complete", "Complete", "Failed", "Complete", "Waiting")
+	for arch in archs:
+		rows = []
+		for idx in range(boxes):
+			status = "Building" if idx == boxes // 2 else statuses[idx % len(statuses)]
+			day, hour = 10 + idx % 18, idx % 24
+			rows.append("\t\t\t<tr>\n\t\t\t\t<td class=\"box%s\">%s%02d</td>\n\t\t\t\t<td class=\"%s\">%s</td>\n" % (idx, arch.lower(), idx, status.lower(), status)
+						+ "\t\t\t\t<td>2023-07-%s %02d:00:00</td>\n\t\t\t\t<td>2023-07-%s %02d:40:00</td>\n\t\t\t\t<td>2023-07-%s %02d:50:00</td>\n" % (day, hour, day, hour, day, hour)
+						+ "\t\t\t\t<td>00:10:00</td>\n\t\t\t\t<td>00:%02d:%02d</td>\n\t\t\t</tr>\n" % (15 + idx % 45, idx % 60))
+		files["%s.html" % arch.lower()] = ("<html><head><title>openATV %s 7.3 build status</title></head><body>\n" % arch
+											+ "<button onclick=\"location.href='http://x/7.2'\">7.2</button><button onclick=\"location.href='http://x/7.3'\">7.3</button>\n"
+											+ "<table><thead>\n\t<tr><th>Box</th><th>Status</th><th>StartBuild</th><th>StartFeedSync</th><th>EndBuild</th><th>SyncTime</th><th>BuildTime</th></tr>\n</thead>\n<tbody>\n"
+											+ "".join(rows) + "</tbody></table></body></html>\n")
+	files["content.json"] = dumps({"versionurls": {"%s 7.3" % arch: {"url": "%s.html" % arch.lower()} for arch in archs}})
+	return files
+
+
+def readfixture(fixturedir):  # {filename: content} of a saved build server, e.g. by 'python Buildstatus.py --from-html'
+	files = dict()
+	for filename in glob(join(fixturedir, "*.json")) + glob(join(fixturedir, "*.htm*")):
+		with open(filename, "r") as f:
+			files[basename(filename)] = f.read()
+	if "content.json" in files:  # the platform pages are served from the fixture too
+		content = loads(files["content.json"])
+		for version in content.get("versionurls", {}).values():
+			version["url"] = basename(version["url"])
+		files["content.json"] = dumps(content)
+	return files
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+	def do_GET(self):
+		server = self.server
+		name = self.path.split("?")[0].lstrip("/")
+		if name.startswith("pictures/") and name.endswith(".png"):
+			body = server.picture
+			ctype = "image/png"
+		elif name == "content.json" and name in server.files:
+			body = server.files[name].replace("\"url\": \"", "\"url\": \"%s" % server.baseurl).encode()  # absolute urls of this server
+			ctype = "application/json"
+		elif name in server.files:
+			body = server.files[name].encode()
+			ctype = "text/html"
+		else:
+			self.send_error(404)
+			return
+		self.send_response(200)
+		self.send_header("Content-Type", ctype)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):  # keep the logs quiet
+		pass
+
+
+def serve(files):
+	httpd = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+	httpd.files = files
+	httpd.picture = makepng(*PICSIZE)
+	httpd.baseurl = "http://127.0.0.1:%s/" % httpd.server_address[1]
+	Thread(target=httpd.serve_forever, daemon=True).start()
+	return httpd
+
+
+def loadpackage():  # imports the plugin package from the source tree like enigma2 does, with the stand-ins in place of enigma2
+	if PACKAGE not in modules:
+		spec = spec_from_file_location(PACKAGE, join(PLUGINDIR, "__init__.py"), submodule_search_locations=[abspath(PLUGINDIR)])
+		package = module_from_spec(spec)
+		modules[PACKAGE] = package
+		spec.loader.exec_module(package)
+	return modules[PACKAGE]
+
+
+def loadplugin(baseurl, tmpdir):
+	loadpackage()
+	buildstatus = import_module("%s.Buildstatus" % PACKAGE)
+	buildstatus.CONTENTURL = "%scontent.json" % baseurl
+	plugin = import_module("%s.plugin" % PACKAGE)
+	plugin.PICURL = "%spictures/" % baseurl
+	plugin.TMPPATH = join(tmpdir, "boxpictures")
+	makedirs(plugin.TMPPATH, exist_ok=True)  # created by the favorites screen, which is always opened first on the receiver
+	return plugin
+
+
+def parsekeys(keys):  # 'down*3,ok' -> ['down', 'down', 'down', 'ok']
+	presses = []
+	for key in [key.strip() for key in keys.split(",") if key.strip()]:
+		found = match(r"^(\w+)(?:\*(\d+))?$", key)
+		if not found:
+			print("[%s] ERROR in module 'parsekeys': invalid key '%s'." % (MODULE_NAME, key))
+			exit(2)
+		presses += [KEYNAMES.get(found.group(1), found.group(1))] * int(found.group(2) or 1)
+	return presses
+
+
+def measure(step, function, timeout, quiet):  # latency of the key handler and until the main loop is idle again, list updates and memory
+	counters = COUNTERS.copy()
+	errors = MAINLOOP.errors
+	tracemalloc.reset_peak()
+	memory = tracemalloc.get_traced_memory()[0]
+	with redirect_stdout(StringIO() if quiet else stdout):
+		start = perf_counter()
+		try:
+			handled = function()
+		except Exception:
+			MAINLOOP.errors += 1
+			handled = True
+			print_exc()
+		handler = perf_counter() - start
+		settled = MAINLOOP.settle(timeout)
+		total = perf_counter() - start
+	current, peak = tracemalloc.get_traced_memory()
+	return {"step": step, "handled": handled is not False, "handler_ms": round(handler * 1000, 2), "settled_ms": round(total * 1000, 2), "settled": settled,
+			"setList": COUNTERS["setList"] - counters["setList"], "updateList": COUNTERS["updateList"] - counters["updateList"], "modifyEntry": COUNTERS["modifyEntry"] - counters["modifyEntry"],
+			"offthread": COUNTERS["offthread"] - counters["offthread"], "errors": MAINLOOP.errors - errors, "memory_kb": round((current - memory) / 1024, 1), "peak_kb": round((peak - memory) / 1024, 1)}
+
+
+def runscenario(plugin, name, screen, keys, timeout, quiet):
+	session = Session()
+
+	def openscreen():
+		if screen == "favorites":
+			plugin.main(session)
+			return
+		plugin.initBuildstatus()
+		if screen == "imageslist":
+			session.open(plugin.ATVimageslist, ("", plugin.FAVLIST[0][1] if plugin.FAVLIST else plugin.BS.archlist[0]))
+		elif screen == "boxdetails":
+			session.open(plugin.ATVboxdetails, plugin.FAVLIST[0] if plugin.FAVLIST else ("%s00" % plugin.BS.archlist[0].lower(), plugin.BS.archlist[0]))
+		elif screen == "config":
+			session.open(plugin.ATVconfig)
+		else:
+			print("[%s] ERROR in module 'runscenario': unknown screen '%s'." % (MODULE_NAME, screen))
+			return False
+	results = [measure("open", openscreen, timeout, quiet)]
+	for key in keys:
+		if not session.dialogs:
+			break
+		results.append(measure(key, lambda key=key: session.key(key), timeout, quiet))
+	while session.dialogs:  # screens left open by the scenario are closed without being measured
+		session.current().close()
+	return {"scenario": name, "steps": results}
+
+
+def report(scenarios):
+	print("%-12s %-12s %10s %10s %8s %10s %11s %9s %10s %9s" % ("scenario", "key", "handler ms", "settled ms", "setList", "updateList", "modifyEntry", "offthread", "memory kB", "peak kB"))
+	for scenario in scenarios:
+		for step in scenario["steps"]:
+			flags = ("" if step["handled"] else " (unhandled)") + ("" if step["settled"] else " (timeout)") + (" (%s errors)" % step["errors"] if step["errors"] else "")
+			print("%-12s %-12s %10.2f %10.2f %8s %10s %11s %9s %10.1f %9.1f%s" % (scenario["scenario"], step["step"], step["handler_ms"], step["settled_ms"], step["setList"], step["updateList"], step["modifyEntry"], step["offthread"], step["memory_kb"], step["peak_kb"], flags))
+		handlers = sorted(step["handler_ms"] for step in scenario["steps"])
+		print("%-12s %-12s %10.2f %10.2f (max handler, sum of settled)" % (scenario["scenario"], "total", handlers[-1], sum(step["settled_ms"] for step in scenario["steps"])))
+
+
+def main(argv):  # shell interface
+	scenarios = list(SCENARIOS)
+	resolution = "HD"
+	fixturedir = None
+	archs = ["ARM", "MIPS", "AARCH64"]
+	boxes = 100
+	favorites = 10
+	jsonfile = None
+	timeout = 30
+	custom = []
+	quiet = True
+	helpstring = "Benchmark v1.0: try 'python benchmark.py -h' for more information"
+	try:
+		opts, args = getopt(argv, "s:r:d:p:b:f:j:t:k:vh", ["scenarios =", "resolution =", "directory =", "platforms =", "boxes =", "favorites =", "json =", "timeout =", "keys =", "verbose", "help"])
+	except GetoptError:
+		print(helpstring)
+		exit(2)
+	for opt, arg in opts:
+		opt = opt.lower().strip()
+		arg = arg.strip()
+		if opt == "-h":
+			print("Usage: python benchmark.py [options...] <data>\n"
+			"-s, --scenarios <names>\t\tRun these scenarios, separated by commas {%s is default}\n"
+			"-r, --resolution <HD|fHD>\tSimulate a screen of this resolution {HD is default}\n"
+			"-d, --directory <path>\t\tServe the build server from this saved content.json and its platform pages {generated data is default}\n"
+			"-p, --platforms <names>\t\tGenerate these architectures, separated by commas {ARM,MIPS,AARCH64 is default}\n"
+			"-b, --boxes <number>\t\tGenerate this number of boxes per platform {100 is default}\n"
+			"-f, --favorites <number>\tSet this number of favorites before the plugin is loaded {10 is default}\n"
+			"-j, --json <filename>\t\tAlso write the results to this file\n"
+			"-t, --timeout <seconds>\t\tWait at most this long for the screen to become idle after a key {30 is default}\n"
+			"-k, --keys <screen:keys>\tRun own key presses, e.g. 'imageslist:down*10,nextMarker*3' (repeatable)\n"
+			"-v, --verbose\t\t\tShow the output of the plugin\n"
+			"Screens: favorites, imageslist, boxdetails, config\n"
+			"Keys: %s, pagedown, pageup" % (",".join(SCENARIOS), ", ".join(ACTIONS)))
+			exit()
+		elif opt in ("-s", "--scenarios"):
+			scenarios = [scenario.strip() for scenario in arg.split(",") if scenario.strip()]
+		elif opt in ("-r", "--resolution"):
+			resolution = "fHD" if arg.lower() == "fhd" else "HD"
+		elif opt in ("-d", "--directory"):
+			fixturedir = arg
+		elif opt in ("-p", "--platforms"):
+			archs = [arch.strip().upper() for arch in arg.split(",") if arch.strip()]
+		elif opt in ("-b", "--boxes"):
+			boxes = int(arg)
+		elif opt in ("-f", "--favorites"):
+			favorites = int(arg)
+		elif opt in ("-j", "--json"):
+			jsonfile = arg
+		elif opt in ("-t", "--timeout"):
+			timeout = float(arg)
+		elif opt in ("-k", "--keys"):
+			screen, keys = arg.split(":", 1) if ":" in arg else ("imageslist", arg)
+			custom.append(("custom-%s" % len(custom), screen.strip(), keys))
+		elif opt in ("-v", "--verbose"):
+			quiet = False
+	runs = [(name, SCENARIOS[name][0], SCENARIOS[name][1]) for name in scenarios if name in SCENARIOS] + custom
+	for name in [name for name in scenarios if name not in SCENARIOS]:
+		print("[%s] ERROR in module 'main': unknown scenario '%s'." % (MODULE_NAME, name))
+	if fixturedir and not isdir(fixturedir):
+		print("[%s] ERROR in module 'main': directory '%s' not found." % (MODULE_NAME, fixturedir))
+		exit(1)
+	files = readfixture(fixturedir) if fixturedir else makefixture(archs, boxes)
+	if "content.json" not in files:
+		print("[%s] ERROR in module 'main': no content.json found in '%s'." % (MODULE_NAME, fixturedir))
+		exit(1)
+	tmpdir = mkdtemp(prefix="atvbenchmark")
+	tempfile.tempdir = tmpdir  # snapshots and pictures of former runs must not falsify the results
+	httpd = serve(files)
+	try:
+		DESKTOP[:] = [1920, 1080] if resolution == "fHD" else [1280, 720]
+		platboxes = []  # [[(boxname, architecture)] of each platform page]
+		for name in sorted(files):
+			found = match(r"^(\w+)\.html?$", name)
+			if found:
+				platboxes.append([(boxname, found.group(1).upper()) for boxname in findall(r'<td\s*class="box\d*">(.*?)</td>', files[name])])
+		favboxes = [box for boxes in zip_longest(*platboxes) for box in boxes if box][:favorites]  # spread over all platforms
+		if favboxes:
+			SETTINGS["config.plugins.OpenATVstatus.favboxes"] = ";".join("(%s,%s)" % box for box in favboxes)
+		tracemalloc.start()
+		with redirect_stdout(StringIO() if quiet else stdout):
+			plugin = loadplugin(httpd.baseurl, tmpdir)
+		results = [runscenario(plugin, name, screen, parsekeys(keys), timeout, quiet) for name, screen, keys in runs]
+		tracemalloc.stop()
+	finally:
+		httpd.shutdown()
+		httpd.server_close()
+		rmtree(tmpdir, ignore_errors=True)
+	report(results)
+	if jsonfile:
+		with open(jsonfile, "w") as f:
+			f.write(dumps({"resolution": resolution, "boxes": boxes, "favorites": favorites, "scenarios": results}, indent=2))
+
+
+if __name__ == "__main__":
+	main(argv[1:])
@@ -0,0 +1,153 @@
+#########################################################################################################
+#                                                                                                       #
+#  Headless stand-in of the enigma2 module 'enigma' for benchmarks of the plugin screens on Linux       #
+#  Coded by Mr.Servo @ openATV (c) 2023                                                                 #
+#  Learn more about the tool by running it in the shell: "python benchmark.py -h"                       #
+#  -----------------------------------------------------------------------------------------------------#
+#  This plugin is licensed under the GNU version 3.0 <https://www.gnu.org/licenses/gpl-3.0.en.html>.    #
+#  This plugin is NOT free software. It is open source, you are allowed to modify it (if you keep       #
+#  the license), but it may not be commercially distributed. Advertise with this tool is not allowed.   #
+#  For other uses, permission from the authors is necessary.                                            #
+#                                                                                                       #
+#########################################################################################################
+
+# PYTHON IMPORTS
+from collections import deque
+from threading import Event, Lock, Thread
+from time import perf_counter
+from traceback import print_exc
+from weakref import WeakSet
+
+BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_HALIGN_CENTER, BT_VALIGN_CENTER = 1, 2, 4, 8
+DESKTOP = [1280, 720]  # size of the simulated screen, 1920x1080 selects the fHD skin
+PEERS = []  # stream urls of simulated peers, e.g. 'http://sf8008.local:8001'
+
+
+class MainLoop():  # the single GUI thread of the receiver: timers and calls from threads are executed here only
+	def __init__(self):
+		self.timers = WeakSet()  # active timers, like on the receiver a timer stops as soon as it is no longer referenced
+		self.posted = deque()  # [(function, args, kwargs)] from twisted's 'callFromThread'
+		self.threads = 0  # running threads from twisted's 'callInThread'
+		self.errors = 0  # exceptions raised in the main loop and in threads
+		self.lock = Lock()
+		self.wakeup = Event()
+
+	def post(self, function, *args, **kwargs):
+		with self.lock:
+			self.posted.append((function, args, kwargs))
+		self.wakeup.set()
+
+	def spawn(self, function, *args, **kwargs):
+		with self.lock:
+			self.threads += 1
+		Thread(target=self.worker, args=(function, args, kwargs), daemon=True).start()
+
+	def worker(self, function, args, kwargs):
+		try:
+			function(*args, **kwargs)
+		except Exception:
+			self.errors += 1
+			print_exc()
+		finally:
+			with self.lock:
+				self.threads -= 1
+			self.wakeup.set()
+
+	def call(self, function, *args, **kwargs):
+		try:
+			function(*args, **kwargs)
+		except Exception:
+			self.errors += 1
+			print_exc()
+
+	def iterate(self):  # runs all pending calls and due timers, returns seconds until the next timer is due (or None)
+		while self.posted:
+			with self.lock:
+				function, args, kwargs = self.posted.popleft()
+			self.call(function, *args, **kwargs)
+		now = perf_counter()
+		for timer in sorted(self.timers, key=lambda timer: timer.due):
+			if timer.active and timer.due <= now:
+				timer.fire()
+		dues = [timer.due for timer in list(self.timers) if timer.active]
+		return max(0, min(dues) - perf_counter()) if dues else None
+
+	def isidle(self):
+		with self.lock:
+			return not self.posted and not self.threads and not any(timer.active for timer in list(self.timers))
+
+	def settle(self, timeout=5):  # runs the loop until nothing is left to do, False if the timeout was reached
+		deadline = perf_counter() + timeout
+		while True:
+			nextdue = self.iterate()
+			if self.isidle():
+				return True
+			if perf_counter() >= deadline:
+				return False
+			self.wakeup.wait(min(0.05, nextdue) if nextdue is not None else 0.05)
+			self.wakeup.clear()
+
+
+MAINLOOP = MainLoop()
+
+
+class eTimer():
+	def __init__(self):
+		self.callback = []
+		self.timeout = self  # old api: timer.timeout.get().append(function)
+		self.active = False
+		self.singleshot = False
+		self.interval = 0
+		self.due = 0
+
+	def get(self):
+		return self.callback
+
+	def start(self, msec, singleshot=False):
+		self.interval = msec / 1000
+		self.singleshot = singleshot
+		self.due = perf_counter() + self.interval
+		self.active = True
+		MAINLOOP.timers.add(self)
+
+	def startLongTimer(self, seconds):
+		self.start(seconds * 1000, True)
+
+	def stop(self):
+		self.active = False
+		MAINLOOP.timers.discard(self)
+
+	def isActive(self):
+		return self.active
+
+	def fire(self):
+		if self.singleshot:
+			self.stop()
+		else:
+			self.due = perf_counter() + self.interval
+		for function in list(self.callback):
+			MAINLOOP.call(function)
+
+
+class eSize():
+	def __init__(self, width, height):
+		self.size = (width, height)
+
+	def width(self):
+		return self.size[0]
+
+	def height(self):
+		return self.size[1]
+
+
+class eDesktop():
+	def size(self):
+		return eSize(*DESKTOP)
+
+
+def getDesktop(screen):
+	return eDesktop()
+
+
+def getPeerStreamingBoxes():
+	return list(PEERS)
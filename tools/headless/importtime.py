@@ -0,0 +1,83 @@
+#########################################################################################################
+#                                                                                                       #
+#  Importtime check for OpenATVstatus: the plugin module must load within its time budget               #
+#  Coded by Mr.Servo @ openATV (c) 2023                                                                 #
+#  Learn more about the tool by running it in the shell: "python importtime.py -h"                      #
+#  -----------------------------------------------------------------------------------------------------#
+#  This plugin is licensed under the GNU version 3.0 <https://www.gnu.org/licenses/gpl-3.0.en.html>.    #
+#  This plugin is NOT free software. It is open source, you are allowed to modify it (if you keep       #
+#  the license), but it may not be commercially distributed. Advertise with this tool is not allowed.   #
+#  For other uses, permission from the authors is necessary.                                            #
+#                                                                                                       #
+#########################################################################################################
+
+# PYTHON IMPORTS
+from contextlib import redirect_stdout
+from getopt import getopt, GetoptError
+from importlib import import_module
+from io import StringIO
+from json import dumps, loads
+from os.path import abspath
+from statistics import median
+from subprocess import run, PIPE
+from sys import exit, argv, executable, modules
+from time import perf_counter
+
+MODULE_NAME = __name__.split(".")[-1]
+LAZYMODULES = ("requests", "xml.etree.ElementTree", "PIL", "Plugins.Extensions.OpenATVstatus.Buildstatus", "Plugins.Extensions.OpenATVstatus.Buildhub", "Plugins.Extensions.OpenATVstatus.Thumbnails")  # loaded on first use only
+
+
+def importplugin():  # runs in a fresh interpreter: enigma2 (the stand-ins) is already loaded, the plugin is not
+	from benchmark import PACKAGE, loadpackage
+	with redirect_stdout(StringIO()):
+		start = perf_counter()
+		loadpackage()
+		plugin = import_module("%s.plugin" % PACKAGE)
+		seconds = perf_counter() - start
+	print(dumps({"seconds": seconds, "budget": plugin.IMPORTBUDGET, "loaded": [name for name in LAZYMODULES if name in modules]}))
+
+
+def main(argv):  # shell interface
+	rounds = 5
+	helpstring = "Importtime v1.0: try 'python importtime.py -h' for more information"
+	try:
+		opts, args = getopt(argv, "n:ch", ["number =", "child", "help"])
+	except GetoptError:
+		print(helpstring)
+		exit(2)
+	for opt, arg in opts:
+		opt = opt.lower().strip()
+		arg = arg.strip()
+		if opt == "-h":
+			print("Usage: python importtime.py [options...] <data>\n"
+			"-n, --number <imports>\tImport the plugin this often, each time in a new interpreter {5 is default}\n"
+			"Exits with 1 if the median import time exceeds IMPORTBUDGET of plugin.py or heavy modules are imported too early")
+			exit()
+		elif opt in ("-n", "--number"):
+			rounds = max(1, int(arg))
+		elif opt in ("-c", "--child"):
+			importplugin()
+			return
+	results = []
+	for idx in range(rounds):
+		child = run([executable, abspath(__file__), "--child"], stdout=PIPE, universal_newlines=True)
+		if child.returncode:
+			print("[%s] ERROR in module 'main': import of the plugin failed." % MODULE_NAME)
+			exit(1)
+		results.append(loads(child.stdout.strip().splitlines()[-1]))
+	seconds = median(result["seconds"] for result in results)
+	budget = results[0]["budget"]
+	loaded = sorted(set(name for result in results for name in result["loaded"]))
+	print("plugin import: %.1f ms (median of %s), budget %.1f ms" % (seconds * 1000, rounds, budget * 1000))
+	failed = False
+	if seconds > budget:
+		print("[%s] ERROR in module 'main': module import exceeded the time budget of %.1f ms!" % (MODULE_NAME, budget * 1000))
+		failed = True
+	if loaded:
+		print("[%s] ERROR in module 'main': imported at load time instead of first use: %s" % (MODULE_NAME, ", ".join(loaded)))
+		failed = True
+	exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+	main(argv[1:])
@@ -0,0 +1,96 @@
+#########################################################################################################
+#                                                                                                       #
+#  Skincache benchmark for OpenATVstatus: screen-open overhead of 'readSkin' with and without cache     #
+#  Coded by Mr.Servo @ openATV (c) 2023                                                                 #
+#  Learn more about the tool by running it in the shell: "python skincache.py -h"                       #
+#  -----------------------------------------------------------------------------------------------------#
+#  This plugin is licensed under the GNU version 3.0 <https://www.gnu.org/licenses/gpl-3.0.en.html>.    #
+#  This plugin is NOT free software. It is open source, you are allowed to modify it (if you keep       #
+#  the license), but it may not be commercially distributed. Advertise with this tool is not allowed.   #
+#  For other uses, permission from the authors is necessary.                                            #
+#                                                                                                       #
+#########################################################################################################
+
+# PYTHON IMPORTS
+from contextlib import redirect_stdout
+from getopt import getopt, GetoptError
+from importlib import import_module
+from io import StringIO
+from os.path import join
+from sys import exit, argv
+from time import perf_counter
+from xml.etree.ElementTree import tostring, parse
+
+# STAND-IN IMPORTS
+from benchmark import DESKTOP, PACKAGE, loadpackage
+
+MODULE_NAME = __name__.split(".")[-1]
+SCREENS = ("ATVfavorites", "ATVimageslist", "ATVboxdetails", "ATVconfig")
+
+
+def parsepercall(skinfile, skin):  # the former 'readSkin': parses the skinfile again for every screen that is opened
+	skintext = ""
+	try:
+		with open(skinfile, "r") as file:
+			try:
+				domskin = parse(file).getroot()
+				for element in domskin:
+					if element.tag == "screen" and element.attrib["name"] == skin:
+						skintext = tostring(element).decode()
+						break
+			except Exception as error:
+				print("[Skin] Error: Unable to parse skin data in '%s' - '%s'!" % (skinfile, error))
+	except OSError as error:
+		print("[Skin] Error: Unexpected error opening skin file '%s'! (%s)" % (skinfile, error))
+	return skintext
+
+
+def measure(function, rounds):  # ms per screen open, all screens are opened in turn
+	start = perf_counter()
+	for idx in range(rounds):
+		for skin in SCREENS:
+			function(skin)
+	return (perf_counter() - start) * 1000 / (rounds * len(SCREENS))
+
+
+def main(argv):  # shell interface
+	rounds = 200
+	helpstring = "Skincache v1.0: try 'python skincache.py -h' for more information"
+	try:
+		opts, args = getopt(argv, "n:h", ["number =", "help"])
+	except GetoptError:
+		print(helpstring)
+		exit(2)
+	for opt, arg in opts:
+		opt = opt.lower().strip()
+		arg = arg.strip()
+		if opt == "-h":
+			print("Usage: python skincache.py [options...] <data>\n"
+			"-n, --number <rounds>\tOpen all screens this often per measurement {200 is default}\n"
+			"Exits with 1 if the cached skins differ from the parsed ones or the cache is not faster")
+			exit()
+		elif opt in ("-n", "--number"):
+			rounds = max(1, int(arg))
+	with redirect_stdout(StringIO()):
+		package = loadpackage()
+		plugin = import_module("%s.plugin" % PACKAGE)
+	failed = False
+	for resolution, desktop in (("HD", [1280, 720]), ("fHD", [1920, 1080])):
+		DESKTOP[:] = desktop
+		skinfile = join(package.PLUGINPATH, "skin_%s.xml" % resolution)
+		for skin in SCREENS:
+			if plugin.readSkin(skin) != parsepercall(skinfile, skin) or not plugin.readSkin(skin):
+				print("[%s] ERROR in module 'main': cached skin of screen '%s' (%s) differs from the skinfile." % (MODULE_NAME, skin, resolution))
+				failed = True
+		plugin.SKINCACHE.clear()
+		first = measure(plugin.readSkin, 1)  # the cache is built by the first screen
+		before = measure(lambda skin: parsepercall(skinfile, skin), rounds)
+		after = measure(plugin.readSkin, rounds)
+		print("%s skin: %.3f ms per screen open before, %.4f ms with cache (%.0fx faster), %.3f ms per screen in the first round" % (resolution, before, after, before / after, first))
+		if after >= before:
+			failed = True
+	exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+	main(argv[1:])
@@ -0,0 +1,10 @@
+# headless stand-in of twisted's reactor, see benchmark.py: threads report back through the simulated main loop
+from enigma import MAINLOOP
+
+
+def callInThread(function, *args, **kwargs):
+	MAINLOOP.spawn(function, *args, **kwargs)
+
+
+def callFromThread(function, *args, **kwargs):
+	MAINLOOP.post(function, *args, **kwargs)